@@ -0,0 +1,25 @@
+from typing import Callable, List, Optional
+
+# Called as listener(family_id, entity) after a write commits
+FamilyChangeListener = Callable[[str, str], None]
+
+_listeners: List[FamilyChangeListener] = []
+
+def on_family_change(listener: FamilyChangeListener) -> FamilyChangeListener:
+    """Registers an in-process listener; usable as a decorator."""
+    _listeners.append(listener)
+    return listener
+
+def notify_family_change(family_id: Optional[str], *entities: str):
+    """
+    Tells in-process caches that rows of the given entity types
+    ("transactions", "accounts", "debts", "budgets", "categories", "members")
+    changed for a family. Every transaction write changes balances and so
+    notifies "accounts"; "account_meta" is only sent when accounts are added,
+    removed or renamed, change type or owner, or members join or leave.
+    """
+    if not family_id:
+        return
+    for entity in entities:
+        for listener in _listeners:
+            listener(str(family_id), entity)
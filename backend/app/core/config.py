@@ -1,9 +1,102 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     SUPABASE_URL: str
     SUPABASE_KEY: str
 
+    # Shared HTTP pool used by the async Supabase client
+    DB_POOL_SIZE: int = 20
+    DB_TIMEOUT: float = 10.0
+    # Rows per request when walking large result sets (PostgREST max-rows)
+    DB_PAGE_SIZE: int = 1000
+
+    # Per-request database call tracing (Server-Timing header, log fields, N+1 warnings)
+    DB_TRACE_ENABLED: bool = True
+    DB_TRACE_MAX_CALLS: int = 10
+    DB_TRACE_REPEAT_THRESHOLD: int = 3
+
+    # Prometheus /metrics; off unless enabled, and scrapers must send METRICS_TOKEN as a Bearer token
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: Optional[str] = None
+
+    # Admin-only endpoints: comma-separated user ids and/or emails
+    ADMIN_USER_IDS: str = ""
+    ADMIN_EMAILS: str = ""
+
+    # Sampling profiler: fraction of requests profiled, kept per route in a ring buffer
+    PROFILER_SAMPLE_RATE: float = 0.0
+    PROFILER_INTERVAL: float = 0.005
+    PROFILER_BUFFER_SIZE: int = 500
+    PROFILER_MAX_STACKS: int = 200
+    # ?profile=true returns a pyinstrument HTML report; only honoured for admins when enabled
+    PROFILE_QUERY_ENABLED: bool = False
+
+    # user -> family resolution cache
+    FAMILY_CACHE_SIZE: int = 10000
+    FAMILY_CACHE_TTL: float = 300.0
+
+    # Auth: "local" verifies JWTs in-process, "remote" asks Supabase Auth
+    AUTH_MODE: str = "local"
+    # Opt-in: ask Supabase Auth when no local key can verify a token
+    AUTH_REMOTE_FALLBACK: bool = False
+    SUPABASE_JWT_SECRET: Optional[str] = None
+    AUTH_JWT_AUDIENCE: str = "authenticated"
+    AUTH_JWKS_TTL: float = 600.0
+    # Unknown key ids are remembered as misses, and the JWKS is refetched at most this often
+    AUTH_JWKS_MISS_TTL: float = 60.0
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_TOKEN_CACHE_TTL: float = 300.0
+
+    # Upper bound for ?limit= on GET /transactions; without ?limit= the full history
+    # is walked server-side up to TRANSACTIONS_UNPAGED_MAX_ROWS
+    TRANSACTIONS_MAX_PAGE_SIZE: int = 500
+    TRANSACTIONS_UNPAGED_MAX_ROWS: int = 50000
+    # Max operations per POST /transactions/batch
+    TRANSACTIONS_BATCH_MAX_OPS: int = 1000
+
+    # Per-family data versions behind ETag / If-None-Match
+    FAMILY_VERSION_CACHE_SIZE: int = 10000
+    FAMILY_VERSION_CACHE_TTL: float = 2.0
+
+    # Categories, account names and members (reference data)
+    REFERENCE_CACHE_SIZE: int = 5000
+    REFERENCE_CACHE_TTL: float = 600.0
+
+    # Per-family dashboard summary cache
+    DASHBOARD_CACHE_SIZE: int = 5000
+    DASHBOARD_CACHE_TTL: float = 300.0
+
+    # Smart Feed insights cache
+    INSIGHTS_CACHE_SIZE: int = 5000
+    INSIGHTS_CACHE_TTL: float = 600.0
+    RECURRING_CACHE_SIZE: int = 1000
+    RECURRING_REBUILD_TTL: float = 3600.0
+    RECURRING_LOOKBACK_DAYS: int = 540
+    # created_at is the writing transaction's start time, so rows committed late can
+    # sort before the watermark; incremental reads re-read this many seconds before it
+    RECURRING_WATERMARK_SLACK: float = 900.0
+
+    # Exports
+    EXPORT_PAGE_SIZE: int = 1000
+    EXPORT_PDF_CHUNK_ROWS: int = 200
+    EXPORT_MAX_CONCURRENCY: int = 2
+    EXPORT_SPOOL_MAX_BYTES: int = 5 * 1024 * 1024
+
+    # Delta sync: log entries per page, and how long tombstones are kept
+    SYNC_PAGE_SIZE: int = 1000
+    SYNC_RETENTION_DAYS: int = 90
+
+    # Bulk CSV/OFX import
+    IMPORT_BATCH_SIZE: int = 500
+    IMPORT_MAX_ROWS: int = 100000
+    IMPORT_MAX_ERRORS: int = 500
+
+    def is_admin(self, user_id: str, email: Optional[str] = None) -> bool:
+        ids = {v.strip() for v in self.ADMIN_USER_IDS.split(",") if v.strip()}
+        emails = {v.strip().lower() for v in self.ADMIN_EMAILS.split(",") if v.strip()}
+        return str(user_id) in ids or bool(email and email.lower() in emails)
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,152 @@
+import abc
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+from app.core.cache import named_caches
+
+# Minimal Prometheus text-format metrics. Children for a label set are
+# created once and then updated in place; everything runs on the event loop
+# (or under the GIL for plain int/float adds), so no locks are taken.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EXPORT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        REGISTRY.append(self)
+
+    @abc.abstractmethod
+    def _new_child(self):
+        ...
+
+    def labels(self, *values: str):
+        """
+        Child for one label set. Hot paths should resolve children once and
+        keep them (e.g. per route or per repository method).
+        """
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, values)} {child.value}")
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), child.counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, values)} {child.sum}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, values)} {child.count}")
+        return lines
+
+REGISTRY: List[_Metric] = []
+
+# Collected at scrape time only (e.g. cache counters kept by the caches themselves)
+_collectors: List[Callable[[], List[str]]] = []
+
+def register_collector(collector: Callable[[], List[str]]):
+    _collectors.append(collector)
+    return collector
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+@register_collector
+def _cache_metrics() -> List[str]:
+    caches = named_caches()
+    lines = []
+    for metric, kind, documentation, attr in (
+        ("cache_hits_total", "counter", "Cache lookups that found a live entry", "hits"),
+        ("cache_misses_total", "counter", "Cache lookups that missed or found an expired entry", "misses"),
+        ("cache_entries", "gauge", "Entries currently held", None),
+    ):
+        lines.append(f"# HELP {metric} {documentation}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, cache in caches.items():
+            value = len(cache) if attr is None else getattr(cache, attr)
+            lines.append(f'{metric}{{cache="{_escape(name)}"}} {value}')
+    return lines
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route template and status", ("method", "route", "status"))
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served").labels()
+REPOSITORY_LATENCY = Histogram("db_repository_call_duration_seconds", "Repository method latency (includes all database round-trips it makes)", ("method",))
+REPOSITORY_ERRORS = Counter("db_repository_call_errors_total", "Repository method calls that raised", ("method",))
+EXPORT_DURATION = Histogram("export_duration_seconds", "Time to produce a transactions export", ("format",), buckets=EXPORT_BUCKETS)
@@ -0,0 +1,96 @@
+import random
+import threading
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, List, NamedTuple, Optional
+from app.core.config import settings
+
+class RouteProfile(NamedTuple):
+    route: str
+    started_at: float
+    duration_ms: float
+    stacks: Dict[str, int]  # collapsed stack -> microseconds of self time
+
+def start_profiler(interval: float):
+    """Starts pyinstrument on the current task. Imported lazily: it is only needed when profiling."""
+    from pyinstrument import Profiler
+    profiler = Profiler(interval=interval, async_mode="enabled")
+    profiler.start()
+    return profiler
+
+def _frame_name(frame) -> str:
+    # ';' separates frames in the collapsed format, so it cannot appear in a name
+    name = f"{frame.function} ({frame.file_path_short}:{frame.line_no})" if frame.file_path_short else str(frame.function)
+    return name.replace(";", ":").replace(" ", "_")
+
+def collapse_session(root_frame, max_stacks: int) -> Dict[str, int]:
+    """pyinstrument call tree -> {"outer;...;inner": self time in microseconds}."""
+    stacks: Counter = Counter()
+    pending = [(root_frame, "")] if root_frame is not None else []
+    while pending:
+        frame, prefix = pending.pop()
+        path = f"{prefix};{_frame_name(frame)}" if prefix else _frame_name(frame)
+        self_time = frame.time - sum(child.time for child in frame.children)
+        if self_time > 0:
+            stacks[path] += int(self_time * 1_000_000)
+        pending.extend((child, path) for child in frame.children)
+    return dict(stacks.most_common(max_stacks))
+
+class SamplingProfiler:
+    """
+    Profiles a random fraction of requests and keeps their collapsed stacks
+    in a bounded ring buffer, so hot paths can be aggregated per route.
+    """
+    def __init__(self, sample_rate: float, interval: float, buffer_size: int, max_stacks: int):
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self._profiles: Deque[RouteProfile] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self):
+        return start_profiler(self.interval)
+
+    def record(self, route: str, profiler, duration_ms: float):
+        session = profiler.stop()
+        stacks = collapse_session(session.root_frame(), self.max_stacks)
+        with self._lock:
+            self._profiles.append(RouteProfile(route, time.time(), duration_ms, stacks))
+
+    def _snapshot(self, route: Optional[str]) -> List[RouteProfile]:
+        with self._lock:
+            profiles = list(self._profiles)
+        return [p for p in profiles if route is None or p.route == route]
+
+    def collapsed(self, route: Optional[str] = None) -> str:
+        """Flamegraph input (flamegraph.pl, speedscope): one 'route;frames... weight' per line."""
+        merged: Counter = Counter()
+        for profile in self._snapshot(route):
+            for stack, weight in profile.stacks.items():
+                merged[f"{profile.route};{stack}"] += weight
+        return "".join(f"{stack} {weight}\n" for stack, weight in merged.most_common())
+
+    def summary(self) -> List[dict]:
+        routes: Dict[str, dict] = {}
+        for profile in self._snapshot(None):
+            entry = routes.setdefault(profile.route, {"route": profile.route, "samples": 0, "total_ms": 0.0, "last_sampled_at": 0.0})
+            entry["samples"] += 1
+            entry["total_ms"] += profile.duration_ms
+            entry["last_sampled_at"] = max(entry["last_sampled_at"], profile.started_at)
+        for entry in routes.values():
+            entry["avg_ms"] = entry["total_ms"] / entry["samples"]
+        return sorted(routes.values(), key=lambda e: e["total_ms"], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+request_profiler = SamplingProfiler(
+    sample_rate=settings.PROFILER_SAMPLE_RATE,
+    interval=settings.PROFILER_INTERVAL,
+    buffer_size=settings.PROFILER_BUFFER_SIZE,
+    max_stacks=settings.PROFILER_MAX_STACKS,
+)
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from typing import Optional
+import httpx
+import jwt
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.supabase import get_supabase
+from app.models.user import AuthUser
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "ES256"}
+
+class KeyUnavailableError(Exception):
+    """Raised when local verification has no key material for a token."""
+
+class TokenVerifier:
+    """
+    Verifies Supabase access tokens locally (HS256 shared secret or the
+    project's JWKS) and remembers already-verified tokens until they expire.
+    """
+    def __init__(self):
+        self._verified = TTLCache(maxsize=settings.AUTH_TOKEN_CACHE_SIZE, ttl=settings.AUTH_TOKEN_CACHE_TTL, name="auth_tokens")
+        self._keys = TTLCache(maxsize=32, ttl=settings.AUTH_JWKS_TTL, name="auth_jwks")
+        # kid -> True for key ids the JWKS did not have, so forged tokens cannot force refetches
+        self._missing_kids = TTLCache(maxsize=1024, ttl=settings.AUTH_JWKS_MISS_TTL, name="auth_jwks_misses")
+        self._jwks_refreshed_at = float("-inf")
+        self._jwks_url = f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json"
+        self._jwks_lock = asyncio.Lock()
+
+    async def verify(self, token: str) -> AuthUser:
+        user = self._verified.get(token)
+        if user is not None:
+            return user
+
+        if settings.AUTH_MODE == "remote":
+            user = await self._verify_remote(token)
+        else:
+            try:
+                user = await self._verify_local(token)
+            except KeyUnavailableError:
+                if not settings.AUTH_REMOTE_FALLBACK:
+                    raise
+                user = await self._verify_remote(token)
+
+        ttl = self._remaining_lifetime(token)
+        if ttl > 0:
+            self._verified.set(token, user, ttl=min(ttl, settings.AUTH_TOKEN_CACHE_TTL))
+        return user
+
+    async def _verify_local(self, token: str) -> AuthUser:
+        header = jwt.get_unverified_header(token)
+        alg = header.get("alg")
+        if alg == "HS256":
+            if not settings.SUPABASE_JWT_SECRET:
+                raise KeyUnavailableError("SUPABASE_JWT_SECRET is not configured")
+            key = settings.SUPABASE_JWT_SECRET
+        elif alg in ASYMMETRIC_ALGORITHMS:
+            key = await self._get_signing_key(header.get("kid"))
+        else:
+            raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm: {alg}")
+
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[alg],
+            audience=settings.AUTH_JWT_AUDIENCE,
+            options={"require": ["exp", "sub"]},
+        )
+        return AuthUser(id=claims["sub"], email=claims.get("email"), role=claims.get("role"))
+
+    async def _verify_remote(self, token: str) -> AuthUser:
+        res = await get_supabase().auth.get_user(token)
+        if not res or not res.user:
+            raise jwt.InvalidTokenError("Invalid authentication credentials")
+        return AuthUser(id=str(res.user.id), email=res.user.email, role=res.user.role)
+
+    async def _get_signing_key(self, kid: Optional[str]):
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+        if self._missing_kids.get(kid):
+            raise KeyUnavailableError("No signing key found for token")
+
+        async with self._jwks_lock:
+            key = self._keys.get(kid)
+            # A key rotation is picked up by one refetch; unknown kids in between are misses
+            if key is None and time.monotonic() - self._jwks_refreshed_at >= settings.AUTH_JWKS_MISS_TTL:
+                self._jwks_refreshed_at = time.monotonic()
+                await self._refresh_jwks()
+                key = self._keys.get(kid)
+        if key is None:
+            self._missing_kids.set(kid, True)
+            raise KeyUnavailableError("No signing key found for token")
+        return key
+
+    async def _refresh_jwks(self):
+        try:
+            async with httpx.AsyncClient(timeout=settings.DB_TIMEOUT) as client:
+                res = await client.get(self._jwks_url, headers={"apikey": settings.SUPABASE_KEY})
+                res.raise_for_status()
+            jwk_set = jwt.PyJWKSet.from_dict(res.json())
+        except (httpx.HTTPError, jwt.PyJWKSetError) as e:
+            raise KeyUnavailableError(f"Could not load JWKS: {e}")
+
+        for jwk in jwk_set.keys:
+            self._keys.set(jwk.key_id, jwk.key)
+
+    def _remaining_lifetime(self, token: str) -> float:
+        try:
+            claims = jwt.decode(token, options={"verify_signature": False})
+        except jwt.PyJWTError:
+            return 0
+        exp = claims.get("exp")
+        return exp - time.time() if exp else 0
+
+token_verifier = TokenVerifier()
@@ -0,0 +1,167 @@
+import functools
+import json
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import unquote
+import httpx
+from app.core.metrics import REPOSITORY_LATENCY, REPOSITORY_ERRORS
+
+class DbCall(NamedTuple):
+    source: Optional[str]   # repository method that issued the call
+    table: str              # table, view or rpc function name
+    operation: str          # select / insert / update / upsert / delete / rpc
+    duration_ms: float
+    rows: Optional[int]
+    shape: str              # operation + table + filter columns/operators, no values
+    paged: bool             # a follow-up page of a walk (keyset cursor or offset)
+
+class RequestTrace:
+    """Database calls issued while serving one request."""
+    def __init__(self):
+        self.calls: List[DbCall] = []
+
+    @property
+    def db_ms(self) -> float:
+        return sum(call.duration_ms for call in self.calls)
+
+    def by_table(self) -> Dict[str, List[float]]:
+        grouped: Dict[str, List[float]] = {}
+        for call in self.calls:
+            grouped.setdefault(f"{call.operation}-{call.table}", []).append(call.duration_ms)
+        return grouped
+
+    def unpaged_calls(self) -> List[DbCall]:
+        """Calls other than follow-up pages of a walk, which scale with the data, not the code."""
+        return [call for call in self.calls if not call.paged]
+
+    def repeated_shapes(self, threshold: int) -> Dict[str, int]:
+        counts = Counter(call.shape for call in self.unpaged_calls())
+        return {shape: n for shape, n in counts.items() if n >= threshold}
+
+    def server_timing(self, total_ms: float) -> str:
+        # Metric names must be tokens, so table names are sanitized
+        entries = [f'total;dur={total_ms:.1f}', f'db;dur={self.db_ms:.1f};desc="{len(self.calls)} calls"']
+        for name, durations in self.by_table().items():
+            token = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in name)
+            entries.append(f'db-{token};dur={sum(durations):.1f};desc="{len(durations)}x"')
+        return ", ".join(entries)
+
+    def log_fields(self) -> dict:
+        return {
+            "db_calls": len(self.calls),
+            "db_ms": round(self.db_ms, 1),
+            "db_rows": sum(call.rows or 0 for call in self.calls),
+            "db_tables": sorted({f"{call.operation}:{call.table}" for call in self.calls}),
+        }
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+_current_source: ContextVar[Optional[str]] = ContextVar("db_call_source", default=None)
+
+def start_trace():
+    """Starts collecting database calls for the current request; returns a reset token."""
+    return _current_trace.set(RequestTrace())
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+def end_trace(token):
+    _current_trace.reset(token)
+
+def traced_repository_method(name: str, method):
+    """
+    Tags every database call made inside `method` with its name and records
+    the method's latency; the metric children are resolved once, here.
+    """
+    latency = REPOSITORY_LATENCY.labels(name)
+    errors = REPOSITORY_ERRORS.labels(name)
+
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = _current_source.set(name)
+        started_at = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        except BaseException:
+            errors.inc()
+            raise
+        finally:
+            latency.observe(time.perf_counter() - started_at)
+            _current_source.reset(token)
+    return wrapper
+
+_METHOD_OPERATIONS = {"GET": "select", "HEAD": "select", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+def _describe(request: httpx.Request):
+    parts = [p for p in request.url.path.split("/") if p]
+    # /rest/v1/<table> and /rest/v1/rpc/<function>; anything else (auth, storage) by service
+    if len(parts) >= 3 and parts[0] == "rest" and parts[2] == "rpc" and len(parts) > 3:
+        return parts[3], "rpc"
+    if len(parts) >= 3 and parts[0] == "rest":
+        operation = _METHOD_OPERATIONS.get(request.method, request.method.lower())
+        if operation == "insert" and "resolution=merge-duplicates" in request.headers.get("prefer", ""):
+            operation = "upsert"
+        return parts[2], operation
+    return (parts[0] if parts else "root"), request.method.lower()
+
+def _shape(operation: str, table: str, request: httpx.Request) -> str:
+    filters = []
+    for key, value in request.url.params.multi_items():
+        if key in ("select", "order", "limit", "offset", "columns", "on_conflict"):
+            filters.append(key)
+        else:
+            filters.append(f"{key}={unquote(value).split('.', 1)[0]}")
+    return f"{operation} {table}?{'&'.join(sorted(filters))}"
+
+# RPC arguments that carry a cursor from the previous page
+_CURSOR_ARGUMENTS = ("p_cursor_", "p_after_")
+
+def _is_follow_up_page(operation: str, request: httpx.Request) -> bool:
+    if operation != "rpc":
+        # .range() is sent as offset/limit parameters or a Range header, depending on the client version
+        offset = request.url.params.get("offset") or request.headers.get("range", "").split("-", 1)[0]
+        return bool(offset) and offset != "0"
+    try:
+        arguments = json.loads(request.content or b"{}")
+    except ValueError:
+        return False
+    return isinstance(arguments, dict) and any(
+        value is not None for key, value in arguments.items() if key.startswith(_CURSOR_ARGUMENTS))
+
+def _row_count(response: httpx.Response) -> Optional[int]:
+    # PostgREST answers reads with Content-Range: <first>-<last>/<total|*> (or */0 when empty)
+    content_range = response.headers.get("content-range")
+    if not content_range:
+        return None
+    span = content_range.split("/", 1)[0]
+    if span == "*":
+        return 0
+    try:
+        first, last = span.split("-", 1)
+        return int(last) - int(first) + 1
+    except ValueError:
+        return None
+
+async def _on_request(request: httpx.Request):
+    if _current_trace.get() is not None:
+        request.extensions["trace_started_at"] = time.perf_counter()
+
+async def _on_response(response: httpx.Response):
+    trace = _current_trace.get()
+    started_at = response.request.extensions.get("trace_started_at")
+    if trace is None or started_at is None:
+        return
+    table, operation = _describe(response.request)
+    trace.calls.append(DbCall(
+        source=_current_source.get(),
+        table=table,
+        operation=operation,
+        duration_ms=(time.perf_counter() - started_at) * 1000,
+        rows=_row_count(response),
+        shape=_shape(operation, table, response.request),
+        paged=_is_follow_up_page(operation, response.request),
+    ))
+
+# Passed to the shared httpx client; timings are time-to-headers of each call
+HTTPX_EVENT_HOOKS = {"request": [_on_request], "response": [_on_response]}
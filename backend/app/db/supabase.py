@@ -1,4 +1,46 @@
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Optional
+import httpx
 from app.core.config import settings
+from app.core.tracing import HTTPX_EVENT_HOOKS
 
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+_client: Optional["AsyncClient"] = None
+_http_client: Optional[httpx.AsyncClient] = None
+
+async def init_supabase() -> "AsyncClient":
+    """
+    Creates the shared async Supabase client on top of a bounded httpx pool.
+    Called once from the application lifespan, which is also where the
+    supabase package (auth, storage and realtime clients included) is imported.
+    """
+    from supabase import acreate_client, AsyncClientOptions
+    global _client, _http_client
+    if _client is None:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.DB_POOL_SIZE,
+                max_keepalive_connections=settings.DB_POOL_SIZE,
+            ),
+            timeout=settings.DB_TIMEOUT,
+            event_hooks=HTTPX_EVENT_HOOKS if settings.DB_TRACE_ENABLED else None,
+        )
+        _client = await acreate_client(
+            settings.SUPABASE_URL,
+            settings.SUPABASE_KEY,
+            options=AsyncClientOptions(httpx_client=_http_client),
+        )
+    return _client
+
+async def close_supabase():
+    global _client, _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _client = None
+    _http_client = None
+
+def get_supabase() -> "AsyncClient":
+    if _client is None:
+        raise RuntimeError("Supabase client is not initialized; init_supabase() must run at startup")
+    return _client
@@ -21,3 +21,10 @@ class BudgetResponse(BudgetBase):
     id: UUID
     family_id: UUID
     created_at: datetime
+
+class BudgetProgress(BudgetResponse):
+    period_start: date
+    period_end: date
+    spent: float
+    remaining: float
+    percentage: float
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import Optional, Literal
+
+class Insight(BaseModel):
+    id: str
+    type: Literal['success', 'warning', 'info', 'neutral']
+    message: str
+    metric: Optional[str] = None
+    icon: Optional[str] = None # Lucide icon name hint
+
+class RecurringExpense(BaseModel):
+    description: str
+    category_id: Optional[str] = None
+    cadence: Literal['weekly', 'biweekly', 'monthly', 'quarterly', 'yearly']
+    interval_days: float
+    average_amount: float
+    occurrences: int
+    last_date: str
+    next_expected_date: str
+    active: bool
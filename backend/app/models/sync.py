@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List
+from uuid import UUID
+
+class EntityChanges(BaseModel):
+    upserts: List[Dict[str, Any]] = []
+    deletes: List[UUID] = []
+
+class SyncResponse(BaseModel):
+    cursor: str
+    has_more: bool
+    # True when the client must (re)load full lists before applying deltas
+    reset: bool
+    changes: Dict[str, EntityChanges]
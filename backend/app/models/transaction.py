@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Literal
+from typing import Any, Dict, List, Optional, Literal
 from uuid import UUID
 from datetime import datetime
 
@@ -34,3 +34,42 @@ class TransactionResponse(TransactionBase):
     account_name: Optional[str] = None
     user_name: Optional[str] = None
     target_account_id: Optional[UUID] = None
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class TransactionImportResult(BaseModel):
+    dry_run: bool
+    # False when the import stopped early; the first `imported` rows are stored
+    complete: bool = True
+    error: Optional[str] = None
+    total_rows: int
+    valid_rows: int
+    imported: int
+    # Rows skipped because their statement id (FITID) was already imported
+    duplicates: int = 0
+    failed_rows: int
+    errors: List[ImportRowError]
+    balance_deltas: Dict[str, float]
+
+class TransactionBatchOperation(BaseModel):
+    op: Literal['create', 'update', 'delete']
+    # Target of update/delete; optional client-generated id for create
+    id: Optional[UUID] = None
+    data: Optional[Dict[str, Any]] = None
+
+class TransactionBatchRequest(BaseModel):
+    operations: List[TransactionBatchOperation]
+    atomic: bool = False
+
+class TransactionBatchOperationResult(BaseModel):
+    index: int
+    status: Literal['ok', 'error', 'rolled_back']
+    id: Optional[UUID] = None
+    data: Optional[TransactionResponse] = None
+    error: Optional[str] = None
+
+class TransactionBatchResult(BaseModel):
+    committed: bool
+    results: List[TransactionBatchOperationResult]
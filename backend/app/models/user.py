@@ -14,3 +14,9 @@ class UserResponse(UserBase):
 
     class Config:
         from_attributes = True
+
+class AuthUser(BaseModel):
+    """Identity extracted from a verified Supabase access token."""
+    id: str
+    email: Optional[str] = None
+    role: Optional[str] = None
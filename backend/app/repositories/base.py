@@ -1,5 +1,14 @@
-from app.db.supabase import supabase
+import inspect
+from app.core.tracing import traced_repository_method
+from app.db.supabase import get_supabase
 
 class BaseRepository:
     def __init__(self):
-        self.db = supabase
+        self.db = get_supabase()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Attribute every database call to the repository method that made it
+        for name, attr in list(vars(cls).items()):
+            if not name.startswith("_") and inspect.iscoroutinefunction(attr):
+                setattr(cls, name, traced_repository_method(f"{cls.__name__}.{name}", attr))
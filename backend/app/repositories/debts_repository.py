@@ -1,32 +1,17 @@
 from app.repositories.base import BaseRepository
 
 class DebtsRepository(BaseRepository):
-    def get_user_profile(self, user_id: str):
-        return self.db.table("profiles").select("family_id").eq("id", user_id).execute()
+    async def get_debts_by_family(self, family_id: str):
+        return await self.db.table("debts").select("*").eq("family_id", family_id).order("created_at", desc=True).execute()
 
-    def get_debts_by_family(self, family_id: str):
-        return self.db.table("debts").select("*").eq("family_id", family_id).order("created_at", desc=True).execute()
+    async def create_debt_atomic(self, family_id: str, user_id: str, debt: dict, tx: dict = None):
+        return await self.db.rpc("create_debt_atomic", {"p_family_id": family_id, "p_user_id": user_id, "p_debt": debt, "p_tx": tx}).execute()
 
-    def insert_debt(self, data: dict):
-        return self.db.table("debts").insert(data).execute()
+    async def update_debt(self, debt_id: str, family_id: str, data: dict):
+        return await self.db.table("debts").update(data).eq("id", debt_id).eq("family_id", family_id).execute()
 
-    def update_debt(self, debt_id: str, family_id: str, data: dict):
-        return self.db.table("debts").update(data).eq("id", debt_id).eq("family_id", family_id).execute()
+    async def delete_debt(self, debt_id: str, family_id: str):
+        return await self.db.table("debts").delete().eq("id", debt_id).eq("family_id", family_id).execute()
 
-    def delete_debt(self, debt_id: str, family_id: str):
-        return self.db.table("debts").delete().eq("id", debt_id).eq("family_id", family_id).execute()
-
-    def get_debt_by_id(self, debt_id: str, family_id: str):
-        return self.db.table("debts").select("*").eq("id", debt_id).eq("family_id", family_id).execute()
-
-    def get_default_category(self, name: str):
-        return self.db.table("categories").select("id").eq("name", name).eq("is_default", True).execute()
-
-    def insert_transaction(self, data: dict):
-        return self.db.table("transactions").insert(data).execute()
-
-    def get_account_balance(self, account_id: str):
-        return self.db.table("accounts").select("balance").eq("id", account_id).execute()
-
-    def update_account_balance(self, account_id: str, new_balance: float):
-        return self.db.table("accounts").update({"balance": new_balance}).eq("id", account_id).execute()
+    async def pay_debt_atomic(self, family_id: str, user_id: str, debt_id: str, tx: dict):
+        return await self.db.rpc("pay_debt_atomic", {"p_family_id": family_id, "p_user_id": user_id, "p_debt_id": debt_id, "p_tx": tx}).execute()
@@ -0,0 +1,15 @@
+from typing import List, Optional
+from app.repositories.base import BaseRepository
+
+class InsightsRepository(BaseRepository):
+    async def get_transaction_columns(self, account_ids: List[str], start_date: str, end_date: str, offset: int, limit: int):
+        # Only the columns the heuristics need, newest first
+        return await self.db.table("transactions").select("amount, type, date, category_id, description").in_("account_id", account_ids).neq("type", "transfer").gte("date", start_date).lt("date", end_date).order("date", desc=True).order("id", desc=True).range(offset, offset + limit - 1).execute()
+
+    async def get_expense_history(self, account_ids: List[str], start_date: str, created_after: Optional[str], offset: int, limit: int):
+        query = self.db.table("transactions").select("id, amount, date, category_id, description, created_at").in_("account_id", account_ids).eq("type", "expense").gte("date", start_date)
+        if created_after: query = query.gte("created_at", created_after)
+        return await query.order("created_at").order("id").range(offset, offset + limit - 1).execute()
+
+    async def get_monthly_budgets(self, family_id: str, year: int, month: int):
+        return await self.db.table("budgets").select("category_id, amount").eq("family_id", family_id).eq("period", "monthly").eq("year", year).eq("month", month).is_("user_id", "null").execute()
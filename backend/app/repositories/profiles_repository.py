@@ -0,0 +1,5 @@
+from app.repositories.base import BaseRepository
+
+class ProfilesRepository(BaseRepository):
+    async def get_family_id(self, user_id: str):
+        return await self.db.table("profiles").select("family_id").eq("id", user_id).execute()
@@ -0,0 +1,16 @@
+from app.repositories.base import BaseRepository
+
+class ReferenceRepository(BaseRepository):
+    async def get_default_categories(self):
+        return await self.db.table("categories").select("*").eq("is_default", True).execute()
+
+    async def get_family_categories(self, family_id: str):
+        return await self.db.table("categories").select("*").eq("family_id", family_id).eq("is_default", False).execute()
+
+    async def get_family_accounts(self, family_id: str):
+        # Balances change on every write and are not reference data
+        return await self.db.table("accounts").select("id, name, type, user_id").eq("family_id", family_id).execute()
+
+    async def get_family_members(self, family_id: str):
+        return await self.db.table("profiles").select("id, full_name, email").eq("family_id", family_id).execute()
+
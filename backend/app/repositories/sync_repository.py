@@ -0,0 +1,12 @@
+from typing import Optional
+from app.repositories.base import BaseRepository
+
+class SyncRepository(BaseRepository):
+    async def get_family_changes(self, family_id: str, after_txid: Optional[int], after_id: Optional[int], limit: int):
+        return await self.db.rpc("get_family_changes", {"p_family_id": family_id, "p_after_txid": after_txid, "p_after_id": after_id, "p_limit": limit}).execute()
+
+    async def get_accounts_by_family(self, family_id: str):
+        return await self.db.table("accounts").select("id, user_id, type").eq("family_id", family_id).execute()
+
+    async def prune_changes(self, keep_days: int):
+        return await self.db.rpc("prune_family_changes", {"p_keep": f"{keep_days} days"}).execute()
@@ -1,42 +1,52 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.repositories.base import BaseRepository
 
 class TransactionsRepository(BaseRepository):
-    def get_user_profile(self, user_id: str):
-        return self.db.table("profiles").select("family_id").eq("id", user_id).execute()
+    async def create_transaction_atomic(self, family_id: str, user_id: str, data: dict):
+        return await self.db.rpc("create_transaction_atomic", {"p_family_id": family_id, "p_user_id": user_id, "p_data": data}).execute()
+
+    async def update_transaction_atomic(self, family_id: str, tx_id: str, updates: dict):
+        return await self.db.rpc("update_transaction_atomic", {"p_family_id": family_id, "p_tx_id": tx_id, "p_updates": updates}).execute()
+
+    async def delete_transaction_atomic(self, family_id: str, tx_id: str):
+        return await self.db.rpc("delete_transaction_atomic", {"p_family_id": family_id, "p_tx_id": tx_id}).execute()
+
+    async def apply_transaction_batch(self, family_id: str, user_id: str, operations: List[dict], atomic: bool):
+        return await self.db.rpc("apply_transaction_batch", {"p_family_id": family_id, "p_user_id": user_id, "p_ops": operations, "p_atomic": atomic}).execute()
+
+    async def import_transaction_batch(self, family_id: str, user_id: str, rows: List[dict]):
+        # Rows and balance deltas are written together; stored external ids are skipped
+        return await self.db.rpc("import_transaction_batch", {"p_family_id": family_id, "p_user_id": user_id, "p_rows": rows}).execute()
+
+    async def get_stored_external_ids(self, account_ids: List[str], external_ids: List[str]):
+        return await self.db.table("transactions").select("account_id, external_id").in_("account_id", account_ids).in_("external_id", external_ids).execute()
+
+    async def get_visible_transactions(
+        self,
+        family_id: str,
+        user_id: str,
+        scope: str = "family",
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        cursor: Optional[Tuple[str, str]] = None,
+        limit: Optional[int] = None,
+    ):
+        """
+        Transactions the user may see in `scope`, newest first, with
+        category/account/user names joined in. `cursor` is the (date, id) of
+        the last row already seen; rows strictly after it in (date desc,
+        id desc) order are returned. Visibility, order and limit all run in
+        the database (get_visible_transactions).
+        """
+        cursor_date, cursor_id = cursor if cursor else (None, None)
+        return await self.db.rpc("get_visible_transactions", {
+            "p_family_id": family_id,
+            "p_user_id": user_id,
+            "p_scope": scope,
+            "p_start_date": start_date,
+            "p_end_date": end_date,
+            "p_cursor_date": cursor_date,
+            "p_cursor_id": cursor_id,
+            "p_limit": limit,
+        }).execute()
 
-    def get_transaction_by_id(self, tx_id: str):
-        return self.db.table("transactions").select("*").eq("id", tx_id).execute()
-
-    def insert_transaction(self, data: dict):
-        return self.db.table("transactions").insert(data).execute()
-
-    def update_transaction(self, tx_id: str, data: dict):
-        return self.db.table("transactions").update(data).eq("id", tx_id).execute()
-
-    def delete_transaction(self, tx_id: str):
-        return self.db.table("transactions").delete().eq("id", tx_id).execute()
-
-    def get_accounts_by_family(self, family_id: str):
-        return self.db.table("accounts").select("id, user_id, balance").eq("family_id", family_id).execute()
-
-    def get_account_by_id(self, account_id: str):
-        return self.db.table("accounts").select("balance").eq("id", account_id).execute()
-
-    def update_account_balance(self, account_id: str, new_balance: float):
-        return self.db.table("accounts").update({"balance": new_balance}).eq("id", account_id).execute()
-
-    def query_transactions(self, filters: dict, order_by: str = "date", desc: bool = True):
-        query = self.db.table("transactions").select("*")
-        for key, value in filters.items():
-            if isinstance(value, list):
-                query = query.in_(key, value)
-            else:
-                query = query.eq(key, value)
-        return query.order(order_by, desc=desc).execute()
-
-    def get_categories(self, family_id: str):
-        return self.db.table("categories").select("id, name").or_(f"family_id.eq.{family_id},is_default.eq.true").execute()
-
-    def get_profiles_by_ids(self, user_ids: list):
-        return self.db.table("profiles").select("id, full_name").in_("id", user_ids).execute()
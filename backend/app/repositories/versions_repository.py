@@ -0,0 +1,5 @@
+from app.repositories.base import BaseRepository
+
+class VersionsRepository(BaseRepository):
+    async def get_family_versions(self, family_id: str):
+        return await self.db.table("family_versions").select("entity, version").eq("family_id", family_id).execute()
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from app.dependencies import get_current_user
+from typing import List, Optional
+from app.dependencies import get_current_user, get_family_id, etag_for
 from app.models.account import AccountCreate, AccountResponse
 from app.repositories.accounts_repository import AccountsRepository
 from app.services.accounts_service import AccountsService
@@ -15,17 +15,19 @@ def get_accounts_service():
 async def create_account(
     account: AccountCreate, 
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: AccountsService = Depends(get_accounts_service)
 ):
     try:
-        return await service.create_account(user.id, account.model_dump())
+        return await service.create_account(user.id, family_id, account.model_dump())
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/", response_model=List[AccountResponse])
+@router.get("/", response_model=List[AccountResponse], dependencies=[Depends(etag_for("accounts"))])
 async def get_my_accounts(
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: AccountsService = Depends(get_accounts_service)
 ):
     # Fixed the typo in my thought process but let's be careful in code
-    return await service.get_my_accounts(user.id)
+    return await service.get_my_accounts(user.id, family_id)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from app.dependencies import get_admin_user
+from app.core.profiling import request_profiler
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+@router.get("/profiles")
+async def get_profile_summary(admin = Depends(get_admin_user)):
+    return {
+        "sample_rate": request_profiler.sample_rate,
+        "routes": request_profiler.summary(),
+    }
+
+@router.get("/profiles/collapsed", response_class=PlainTextResponse)
+async def get_collapsed_stacks(route: Optional[str] = None, admin = Depends(get_admin_user)):
+    # Feed to flamegraph.pl or paste into speedscope.app
+    return request_profiler.collapsed(route)
+
+@router.delete("/profiles")
+async def clear_profiles(admin = Depends(get_admin_user)):
+    request_profiler.clear()
+    return {"status": "cleared"}
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from app.dependencies import get_current_user
-from app.models.budget import BudgetCreate, BudgetResponse
+from typing import List, Optional
+from app.dependencies import get_current_user, get_family_id, etag_for
+from app.models.budget import BudgetCreate, BudgetResponse, BudgetProgress
 from app.repositories.budgets_repository import BudgetsRepository
 from app.services.budgets_service import BudgetsService
 from uuid import UUID
@@ -12,22 +12,36 @@ def get_budgets_service():
     repo = BudgetsRepository()
     return BudgetsService(repo)
 
-@router.get("/", response_model=List[BudgetResponse])
+@router.get("/", response_model=List[BudgetResponse], dependencies=[Depends(etag_for("budgets"))])
 async def get_budgets(
     scope: str = "family", 
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: BudgetsService = Depends(get_budgets_service)
 ):
-    return await service.get_budgets(user.id, scope)
+    return await service.get_budgets(user.id, family_id, scope)
+
+@router.get("/progress", response_model=List[BudgetProgress], dependencies=[Depends(etag_for("budgets", "transactions", "accounts"))])
+async def get_budget_progress(
+    scope: str = "family",
+    user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
+    service: BudgetsService = Depends(get_budgets_service)
+):
+    try:
+        return await service.get_budget_progress(user.id, family_id, scope)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/", response_model=BudgetResponse)
 async def create_budget(
     budget: BudgetCreate, 
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: BudgetsService = Depends(get_budgets_service)
 ):
     try:
-        return await service.create_or_update_budget(user.id, budget.model_dump())
+        return await service.create_or_update_budget(user.id, family_id, budget.model_dump())
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -35,7 +49,8 @@ async def create_budget(
 async def delete_budget(
     budget_id: UUID, 
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: BudgetsService = Depends(get_budgets_service)
 ):
-    await service.delete_budget(user.id, str(budget_id))
+    await service.delete_budget(user.id, family_id, str(budget_id))
     return {"status": "deleted"}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
-from typing import List
-from app.dependencies import get_current_user
+from typing import List, Optional
+from app.dependencies import get_current_user, get_family_id, etag_for
 from app.models.category import CategoryResponse
 from app.repositories.categories_repository import CategoriesRepository
 from app.services.categories_service import CategoriesService
@@ -11,9 +11,10 @@ def get_categories_service():
     repo = CategoriesRepository()
     return CategoriesService(repo)
 
-@router.get("/", response_model=List[CategoryResponse])
+@router.get("/", response_model=List[CategoryResponse], dependencies=[Depends(etag_for("categories"))])
 async def get_categories(
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: CategoriesService = Depends(get_categories_service)
 ):
-    return await service.get_categories(user.id)
+    return await service.get_categories(user.id, family_id)
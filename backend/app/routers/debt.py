@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from app.dependencies import get_current_user
+from typing import List, Optional
+from app.dependencies import get_current_user, get_family_id, etag_for
 from app.models.debt import DebtCreate, DebtResponse
 from app.repositories.debts_repository import DebtsRepository
 from app.services.debts_service import DebtsService
@@ -12,21 +12,23 @@ def get_debts_service():
     repo = DebtsRepository()
     return DebtsService(repo)
 
-@router.get("/", response_model=List[DebtResponse])
+@router.get("/", response_model=List[DebtResponse], dependencies=[Depends(etag_for("debts"))])
 async def get_debts(
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: DebtsService = Depends(get_debts_service)
 ):
-    return await service.get_debts(user.id)
+    return await service.get_debts(user.id, family_id)
 
 @router.post("/", response_model=DebtResponse)
 async def create_debt(
     debt: DebtCreate, 
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: DebtsService = Depends(get_debts_service)
 ):
     try:
-        return await service.create_debt(user.id, debt.model_dump())
+        return await service.create_debt(user.id, family_id, debt.model_dump())
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -35,10 +37,11 @@ async def update_debt(
     debt_id: UUID, 
     update_data: dict, 
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: DebtsService = Depends(get_debts_service)
 ):
     try:
-        return await service.update_debt(user.id, str(debt_id), update_data)
+        return await service.update_debt(user.id, family_id, str(debt_id), update_data)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -46,9 +49,10 @@ async def update_debt(
 async def delete_debt(
     debt_id: UUID, 
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: DebtsService = Depends(get_debts_service)
 ):
-    await service.delete_debt(user.id, str(debt_id))
+    await service.delete_debt(user.id, family_id, str(debt_id))
     return {"status": "deleted"}
 
 @router.post("/{debt_id}/pay")
@@ -56,9 +60,10 @@ async def pay_debt(
     debt_id: UUID,
     payment_data: dict,
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: DebtsService = Depends(get_debts_service)
 ):
     try:
-        return await service.pay_debt(user.id, str(debt_id), payment_data)
+        return await service.pay_debt(user.id, family_id, str(debt_id), payment_data)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
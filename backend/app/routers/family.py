@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from app.dependencies import get_current_user
+from typing import List, Optional
+from app.dependencies import get_current_user, get_family_id, etag_for
 from app.models.family import FamilyCreate, FamilyResponse
 from app.repositories.family_repository import FamilyRepository
 from app.services.family_service import FamilyService
@@ -40,20 +40,23 @@ async def join_family(
 @router.post("/leave", response_model=bool)
 async def leave_family(
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: FamilyService = Depends(get_family_service)
 ):
-    return await service.leave_family(user.id)
+    return await service.leave_family(user.id, family_id)
 
-@router.get("/members", response_model=List[dict])
+@router.get("/members", response_model=List[dict], dependencies=[Depends(etag_for("members"))])
 async def get_family_members(
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: FamilyService = Depends(get_family_service)
 ):
-    return await service.get_family_members(user.id)
+    return await service.get_family_members(user.id, family_id)
 
 @router.get("/", response_model=List[FamilyResponse])
 async def get_my_family(
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: FamilyService = Depends(get_family_service)
 ):
-    return await service.get_my_family(user.id)
+    return await service.get_my_family(user.id, family_id)
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+from typing import List, Optional
+from app.dependencies import get_current_user, get_family_id
+from app.models.insight import Insight, RecurringExpense
+from app.repositories.insights_repository import InsightsRepository
+from app.services.insights_service import InsightsService
+
+router = APIRouter(prefix="/insights", tags=["insights"])
+
+def get_insights_service():
+    repo = InsightsRepository()
+    return InsightsService(repo)
+
+@router.get("/", response_model=List[Insight])
+async def get_insights(
+    user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
+    service: InsightsService = Depends(get_insights_service)
+):
+    return await service.get_insights(user.id, family_id)
+
+@router.get("/recurring", response_model=List[RecurringExpense])
+async def get_recurring_expenses(
+    user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
+    service: InsightsService = Depends(get_insights_service)
+):
+    return await service.get_recurring_expenses(user.id, family_id)
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from app.dependencies import get_current_user
+from typing import List, Optional
+from app.dependencies import get_admin_user, get_current_user, get_family_id
 from app.repositories.stats_repository import StatsRepository
-from app.services.stats_service import StatsService
+from app.services.stats_service import StatsService, dashboard_cache_stats
+from app.services.reference_data import reference_cache_stats
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/stats", tags=["stats"])
@@ -27,10 +28,16 @@ def get_stats_service():
 @router.get("/dashboard", response_model=DashboardStats)
 async def get_dashboard_stats(
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: StatsService = Depends(get_stats_service)
 ):
-    stats = await service.get_dashboard_summary(user.id)
+    stats = await service.get_dashboard_summary(user.id, family_id)
     if not stats:
         raise HTTPException(status_code=404, detail="Profile or summary not found")
     
     return stats
+
+# Process-wide counters across every family, so operators only
+@router.get("/cache")
+async def get_dashboard_cache_stats(admin = Depends(get_admin_user)):
+    return {**dashboard_cache_stats(), "reference": reference_cache_stats()}
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from app.core.config import settings
+from app.dependencies import get_current_user, get_family_id
+from app.models.sync import SyncResponse
+from app.repositories.sync_repository import SyncRepository
+from app.services.sync_service import SyncService, SyncCursorExpired
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+def get_sync_service():
+    repo = SyncRepository()
+    return SyncService(repo)
+
+@router.get("/", response_model=SyncResponse)
+async def get_changes(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.SYNC_PAGE_SIZE),
+    user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
+    service: SyncService = Depends(get_sync_service)
+):
+    try:
+        return await service.get_changes(user.id, family_id, cursor, limit)
+    except SyncCursorExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
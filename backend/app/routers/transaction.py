@@ -1,19 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
 from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from datetime import datetime
-import io
-from app.dependencies import get_current_user
-from app.models.transaction import TransactionCreate, TransactionResponse, TransactionUpdate
+from uuid import UUID
+from app.core.config import settings
+from app.dependencies import get_current_user, get_family_id, etag_for
+from app.models.transaction import TransactionCreate, TransactionResponse, TransactionUpdate, TransactionImportResult, TransactionBatchRequest, TransactionBatchResult
 from app.repositories.transactions_repository import TransactionsRepository
 from app.services.transactions_service import TransactionsService
-
-# PDF Imports
-from io import BytesIO
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
+from app.services.export_service import render_transactions_pdf, iter_file, iter_csv, iter_ndjson
+from app.services.import_service import detect_format, iter_csv_rows, iter_ofx_rows
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
@@ -25,33 +21,76 @@ def get_transactions_service():
 async def create_transaction(
     transaction: TransactionCreate, 
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
+    service: TransactionsService = Depends(get_transactions_service)
+):
+    try:
+        return await service.create_transaction(user.id, family_id, transaction.model_dump())
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/batch", response_model=TransactionBatchResult)
+async def apply_transaction_batch(
+    batch: TransactionBatchRequest,
+    user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
+    service: TransactionsService = Depends(get_transactions_service)
+):
+    try:
+        operations = [op.model_dump() for op in batch.operations]
+        return await service.apply_batch(user.id, family_id, operations, batch.atomic)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/import", response_model=TransactionImportResult)
+async def import_transactions(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    account_id: Optional[UUID] = None,
+    dry_run: bool = False,
+    user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: TransactionsService = Depends(get_transactions_service)
 ):
+    # account_id is the default for rows without one (always the case for OFX statements)
     try:
-        return await service.create_transaction(user.id, transaction.model_dump())
+        rows = iter_ofx_rows(file) if detect_format(file.filename, format) == "ofx" else iter_csv_rows(file)
+        return await service.import_transactions(user.id, family_id, rows, str(account_id) if account_id else None, dry_run)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/", response_model=List[TransactionResponse])
+# Rows embed category, account and member names, so those versions count too
+@router.get("/", response_model=List[TransactionResponse], dependencies=[Depends(etag_for("transactions", "categories", "accounts", "members"))])
 async def get_transactions(
+    response: Response,
     scope: str = "family", 
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    limit: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.TRANSACTIONS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: TransactionsService = Depends(get_transactions_service)
 ):
-    return await service.get_transactions(user.id, scope, start_date, end_date, limit)
+    try:
+        transactions, next_cursor = await service.get_transactions_page(user.id, family_id, scope, start_date, end_date, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # The body stays a plain list for existing clients; the next page is announced in a header
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return transactions
 
 @router.patch("/{transaction_id}", response_model=TransactionResponse)
 async def update_transaction(
     transaction_id: str, 
     updates: TransactionUpdate, 
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: TransactionsService = Depends(get_transactions_service)
 ):
     try:
-        return await service.update_transaction(user.id, transaction_id, updates.model_dump(exclude_unset=True))
+        return await service.update_transaction(user.id, family_id, transaction_id, updates.model_dump(exclude_unset=True))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -59,10 +98,11 @@ async def update_transaction(
 async def delete_transaction(
     transaction_id: str, 
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: TransactionsService = Depends(get_transactions_service)
 ):
     try:
-        await service.delete_transaction(user.id, transaction_id)
+        await service.delete_transaction(user.id, family_id, transaction_id)
         return {"status": "success", "message": "Transaction deleted"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -73,55 +113,45 @@ async def export_transactions(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
     service: TransactionsService = Depends(get_transactions_service)
 ):
-    # For now keeping PDF logic here or we could move it to a helper. 
-    # Let's use the service to get the data first.
-    transactions = await service.get_transactions(user.id, scope, start_date, end_date)
-    
-    # Generar PDF (same logic as before but using enriched data)
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=18)
-    
-    data = [["Fecha", "Tipo", "Descripción", "Monto", "Categoría", "Cuenta", "Usuario", "Recibo"]]
-    styles = getSampleStyleSheet()
-    link_style = styles["BodyText"]
-    link_style.alignment = 1 # Center
-
-    for tx in transactions:
-        receipt_cell = "-"
-        if tx.get("receipt_url"):
-            receipt_cell = Paragraph(f'<a href="{tx.get("receipt_url")}" color="blue">Ver</a>', link_style)
+    # Pages are pulled from the database while the PDF is laid out in a worker thread
+    pages = service.iter_transaction_pages(user.id, family_id, scope, start_date, end_date, settings.EXPORT_PAGE_SIZE)
+    spool = await render_transactions_pdf(pages)
 
-        data.append([
-            tx.get("date")[:10],
-            tx.get("type"),
-            Paragraph(tx.get("description") or "", styles['Normal']),
-            f"${tx.get('amount'):,.2f}",
-            tx.get("category_name") or "-",
-            tx.get("account_name") or "-",
-            tx.get("user_name") or "-",
-            receipt_cell
-        ])
-
-    table = Table(data, repeatRows=1)
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 8),
-        ("LEFTPADDING", (0, 0), (-1, -1), 3),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 3),
-    ]))
-    
-    elements = [table]
-    doc.build(elements)
-    buffer.seek(0)
     filename = f"audit_export_{scope}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     return StreamingResponse(
-        buffer,
+        iter_file(spool),
         media_type="application/pdf",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
+
+@router.get("/export.csv")
+async def export_transactions_csv(
+    scope: str = "family",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
+    service: TransactionsService = Depends(get_transactions_service)
+):
+    pages = service.iter_transaction_pages(user.id, family_id, scope, start_date, end_date, settings.EXPORT_PAGE_SIZE)
+    filename = f"transactions_{scope}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    return StreamingResponse(
+        iter_csv(pages),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@router.get("/export.ndjson")
+async def export_transactions_ndjson(
+    scope: str = "family",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    user = Depends(get_current_user),
+    family_id: Optional[str] = Depends(get_family_id),
+    service: TransactionsService = Depends(get_transactions_service)
+):
+    pages = service.iter_transaction_pages(user.id, family_id, scope, start_date, end_date, settings.EXPORT_PAGE_SIZE)
+    return StreamingResponse(iter_ndjson(pages), media_type="application/x-ndjson")
@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import List, Optional
+from app.core.changes import notify_family_change
 from app.services.base import BaseService
 from app.repositories.accounts_repository import AccountsRepository
 
@@ -7,18 +8,12 @@ class AccountsService(BaseService):
     def __init__(self, repository: AccountsRepository):
         super().__init__(repository)
 
-    async def get_my_accounts(self, user_id: str):
-        profile_res = self.repository.get_user_profile(user_id)
-        if not profile_res.data:
-            return []
-        
-        family_id = profile_res.data[0].get('family_id')
-        
+    async def get_my_accounts(self, user_id: str, family_id: Optional[str]):
         if not family_id:
-            res = self.repository.get_accounts_by_user(user_id)
+            res = await self.repository.get_accounts_by_user(user_id)
             return res.data or []
 
-        res = self.repository.get_accounts_by_family(family_id)
+        res = await self.repository.get_accounts_by_family(family_id)
         all_accounts = res.data or []
 
         return [
@@ -26,13 +21,10 @@ class AccountsService(BaseService):
             if acc['type'] == 'joint' or (acc['type'] == 'personal' and acc['user_id'] == str(user_id))
         ]
 
-    async def create_account(self, user_id: str, account_data: dict):
-        profile_res = self.repository.get_user_profile(user_id)
-        if not profile_res.data or not profile_res.data[0].get('family_id'):
+    async def create_account(self, user_id: str, family_id: Optional[str], account_data: dict):
+        if not family_id:
              raise Exception("User does not belong to a family")
         
-        family_id = profile_res.data[0]['family_id']
-        
         data = {**account_data}
         data['family_id'] = family_id
         if data.get('type') == 'personal':
@@ -40,7 +32,7 @@ class AccountsService(BaseService):
         else:
             data['user_id'] = None
 
-        res = self.repository.create_account(data)
+        res = await self.repository.create_account(data)
         if not res.data:
             raise Exception("Failed to create account")
         
@@ -57,6 +49,8 @@ class AccountsService(BaseService):
                 "type": "income",
                 "date": datetime.utcnow().isoformat()
             }
-            self.repository.create_transaction(tx_data)
-            
+            await self.repository.create_transaction(tx_data)
+            notify_family_change(family_id, "transactions")
+
+        notify_family_change(family_id, "accounts", "account_meta")
         return new_account
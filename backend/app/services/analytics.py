@@ -0,0 +1,195 @@
+"""
+Vectorized heuristics behind the dashboard Smart Feed. Transactions are
+loaded once into a columnar TransactionFrame and every heuristic is a few
+NumPy mask/reduce operations over it.
+"""
+import calendar
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List
+import numpy as np
+
+RECURRING_AMOUNT_TOLERANCE = 100.0
+
+@dataclass
+class TransactionFrame:
+    amount: np.ndarray       # float64
+    day: np.ndarray          # datetime64[D]
+    is_income: np.ndarray    # bool
+    is_expense: np.ndarray   # bool
+    category: np.ndarray     # object (category id or "")
+    description: np.ndarray  # object
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict]) -> "TransactionFrame":
+        n = len(rows)
+        types = np.array([r['type'] for r in rows], dtype=object)
+        return cls(
+            amount=np.fromiter((float(r['amount']) for r in rows), dtype=np.float64, count=n),
+            day=np.array([r['date'][:10] for r in rows], dtype='datetime64[D]'),
+            is_income=types == 'income',
+            is_expense=types == 'expense',
+            category=np.array([str(r.get('category_id') or "") for r in rows], dtype=object),
+            description=np.array([r.get('description') or "" for r in rows], dtype=object),
+        )
+
+    def __len__(self):
+        return len(self.amount)
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def previous_month_start(day: date) -> date:
+    return month_start(month_start(day) - timedelta(days=1))
+
+def group_sums(keys: np.ndarray, values: np.ndarray) -> Dict[str, float]:
+    """Sum of `values` per distinct key."""
+    if len(keys) == 0:
+        return {}
+    uniques, inverse = np.unique(keys, return_inverse=True)
+    sums = np.bincount(inverse, weights=values)
+    return dict(zip(uniques.tolist(), sums.tolist()))
+
+def recurring_matches(frame: TransactionFrame, current: np.ndarray, previous: np.ndarray, tolerance: float = RECURRING_AMOUNT_TOLERANCE) -> np.ndarray:
+    """
+    Indices of `current` expenses that have a `previous` expense with the same
+    description and an amount within `tolerance`. Rows are sorted by
+    (description, amount) once and probed with searchsorted, which is
+    O(n log n) rather than comparing every pair.
+    """
+    cur_idx = np.flatnonzero(current)
+    prev_idx = np.flatnonzero(previous)
+    if len(cur_idx) == 0 or len(prev_idx) == 0:
+        return np.array([], dtype=np.int64)
+
+    _, codes = np.unique(frame.description[np.concatenate([cur_idx, prev_idx])], return_inverse=True)
+    cur_codes, prev_codes = codes[:len(cur_idx)], codes[len(cur_idx):]
+
+    # Offsetting every description into its own amount band lets one sorted
+    # array answer "same description and amount close enough".
+    amounts = frame.amount
+    band = float(np.ptp(amounts[np.concatenate([cur_idx, prev_idx])])) + 4 * tolerance + 1
+    prev_keys = np.sort(prev_codes * band + amounts[prev_idx])
+    cur_keys = cur_codes * band + amounts[cur_idx]
+
+    lo = np.searchsorted(prev_keys, cur_keys - tolerance, side="right")
+    hi = np.searchsorted(prev_keys, cur_keys + tolerance, side="left")
+    return cur_idx[hi > lo]
+
+def format_money(amount: float) -> str:
+    return f"${amount:,.0f}".replace(",", ".")
+
+def compute_insights(frame: TransactionFrame, budgets: List[Dict], category_names: Dict[str, str], today: date) -> List[Dict]:
+    insights: List[Dict] = []
+    cur_start = np.datetime64(month_start(today), 'D')
+    last_start = np.datetime64(previous_month_start(today), 'D')
+
+    in_current = frame.day >= cur_start
+    in_last = (frame.day >= last_start) & (frame.day < cur_start)
+    cur_expense = in_current & frame.is_expense
+    cur_income = in_current & frame.is_income
+    last_expense = in_last & frame.is_expense
+
+    cur_total_expense = float(frame.amount[cur_expense].sum())
+    cur_total_income = float(frame.amount[cur_income].sum())
+    last_total_expense = float(frame.amount[last_expense].sum())
+
+    # 1. Total Spend Comparison (MoM)
+    if last_total_expense > 0:
+        percent_change = (cur_total_expense - last_total_expense) / last_total_expense * 100
+        if cur_total_expense > last_total_expense:
+            insights.append({
+                "id": "mom-spend-higher",
+                "type": "warning",
+                "message": f"Has gastado un {percent_change:.0f}% más que el mes pasado completo.",
+                "metric": "Gastos al alza",
+                "icon": "TrendingUp",
+            })
+        elif cur_total_expense < last_total_expense and today.day > 20:
+            insights.append({
+                "id": "mom-spend-lower",
+                "type": "success",
+                "message": f"Vas por buen camino. Has gastado un {abs(percent_change):.0f}% menos que el mes pasado.",
+                "metric": "Ahorro potencial",
+                "icon": "TrendingDown",
+            })
+
+    # 2. Savings Rate
+    if cur_total_income > 0:
+        savings_rate = (cur_total_income - cur_total_expense) / cur_total_income * 100
+        if savings_rate > 20:
+            insights.append({
+                "id": "savings-rate",
+                "type": "success",
+                "message": f"¡Excelente! Estás ahorrando el {savings_rate:.0f}% de tus ingresos este mes.",
+                "metric": "Salud Financiera",
+                "icon": "PiggyBank",
+            })
+
+    # 3. Recurring Payments Detection
+    recurring = recurring_matches(frame, cur_expense, last_expense)
+    if len(recurring) > 0:
+        insights.append({
+            "id": "recurring-detect",
+            "type": "info",
+            "message": f"Detectamos {len(recurring)} pagos recurrentes (ej. {frame.description[recurring[0]]}).",
+            "metric": "Suscripciones",
+            "icon": "CalendarClock",
+        })
+
+    # 4. Budget Prediction
+    spent_by_category = group_sums(frame.category[cur_expense], frame.amount[cur_expense])
+    if budgets:
+        month_progress = today.day / calendar.monthrange(today.year, today.month)[1]
+        for budget in budgets:
+            limit = float(budget['amount'] or 0)
+            if limit <= 0:
+                continue
+            budget_progress = spent_by_category.get(str(budget.get('category_id') or ""), 0.0) / limit
+            if budget_progress > month_progress + 0.2 and budget_progress < 1:
+                name = category_names.get(str(budget.get('category_id'))) or 'la categoría'
+                insights.append({
+                    "id": "budget-risk",
+                    "type": "warning",
+                    "message": f"Cuidado con {name}. A este ritmo excederás tu presupuesto antes de fin de mes.",
+                    "metric": "Proyección",
+                    "icon": "Activity",
+                })
+                break
+
+    # 5. Top Category this month
+    if spent_by_category:
+        top_category, top_amount = max(spent_by_category.items(), key=lambda item: item[1])
+        top_name = category_names.get(top_category)
+        if top_name and top_amount > 0:
+            insights.append({
+                "id": "top-cat",
+                "type": "neutral",
+                "message": f"Tu mayor gasto este mes ha sido en {top_name}.",
+                "metric": format_money(top_amount),
+                "icon": "PieChart",
+            })
+
+    # 6. Anomaly Detection (Single large expense)
+    if cur_total_expense > 0:
+        large = np.flatnonzero(cur_expense & (frame.amount > cur_total_expense * 0.4))
+        if len(large) > 0:
+            insights.append({
+                "id": "anomaly-detect",
+                "type": "neutral",
+                "message": f"Notamos un movimiento grande: \"{frame.description[large[0]] or 'Gasto'}\" representa el 40%+ de tus gastos.",
+                "icon": "AlertTriangle",
+            })
+
+    if not insights:
+        insights.append(welcome_insight())
+
+    return insights[:4]
+
+def welcome_insight() -> Dict:
+    return {
+        "id": "welcome",
+        "type": "info",
+        "message": "Registra más movimientos para obtener análisis detallados.",
+        "icon": "Sparkles",
+    }
@@ -0,0 +1,26 @@
+from collections import defaultdict
+from typing import Dict
+
+def transaction_deltas(tx: dict, sign: int = 1) -> Dict[str, float]:
+    """
+    Account balance changes caused by a transaction. Use sign=-1 to get the
+    deltas that reverse it.
+    """
+    amount = float(tx['amount']) * sign
+    deltas: Dict[str, float] = defaultdict(float)
+    if tx['type'] in ['expense', 'transfer']:
+        deltas[str(tx['account_id'])] -= amount
+    else:
+        deltas[str(tx['account_id'])] += amount
+
+    if tx['type'] == 'transfer' and tx.get('target_account_id'):
+        deltas[str(tx['target_account_id'])] += amount
+    return deltas
+
+def merge_deltas(*parts: Dict[str, float]) -> Dict[str, float]:
+    """Coalesces several delta maps into one, dropping accounts that net to zero."""
+    merged: Dict[str, float] = defaultdict(float)
+    for part in parts:
+        for account_id, delta in part.items():
+            merged[account_id] += delta
+    return {account_id: delta for account_id, delta in merged.items() if delta}
@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import List, Optional
+from app.core.changes import notify_family_change
 from app.services.base import BaseService
 from app.repositories.budgets_repository import BudgetsRepository
 
@@ -7,29 +8,32 @@ class BudgetsService(BaseService):
     def __init__(self, repository: BudgetsRepository):
         super().__init__(repository)
 
-    async def get_budgets(self, user_id: str, scope: str = "family"):
-        profile_res = self.repository.get_user_profile(user_id)
-        if not profile_res.data or not profile_res.data[0].get('family_id'):
+    async def get_budgets(self, user_id: str, family_id: Optional[str], scope: str = "family"):
+        if not family_id:
             return []
         
-        family_id = profile_res.data[0]['family_id']
-        
         filters = {"family_id": family_id}
         if scope == "personal":
             filters["user_id"] = user_id
         else:
             filters["user_id"] = None # Shared family budgets
 
-        res = self.repository.query_budgets(filters)
+        res = await self.repository.query_budgets(filters)
+        return res.data or []
+
+    async def get_budget_progress(self, user_id: str, family_id: Optional[str], scope: str = "family"):
+        if not family_id:
+            return []
+        if scope not in ("family", "personal", "all"):
+            raise ValueError("scope must be 'family', 'personal' or 'all'")
+
+        res = await self.repository.get_budget_progress(family_id, str(user_id), scope)
         return res.data or []
 
-    async def create_or_update_budget(self, user_id: str, budget_data: dict):
-        profile_res = self.repository.get_user_profile(user_id)
-        if not profile_res.data or not profile_res.data[0].get('family_id'):
+    async def create_or_update_budget(self, user_id: str, family_id: Optional[str], budget_data: dict):
+        if not family_id:
             raise Exception("User not in a family")
         
-        family_id = profile_res.data[0]['family_id']
-        
         data = {**budget_data}
         data['family_id'] = family_id
         for date_key in ['start_date', 'end_date']:
@@ -47,17 +51,17 @@ class BudgetsService(BaseService):
             "user_id": data.get('user_id')
         }
         
-        existing = self.repository.query_budgets(check_filters)
+        existing = await self.repository.query_budgets(check_filters)
         budget_id = existing.data[0]['id'] if existing.data else None
         
-        res = self.repository.upsert_budget(budget_id, data)
+        res = await self.repository.upsert_budget(budget_id, data)
         if not res.data:
             raise Exception("Failed to create/update budget")
         
+        notify_family_change(family_id, "budgets")
         return res.data[0]
 
-    async def delete_budget(self, user_id: str, budget_id: str):
-        profile_res = self.repository.get_user_profile(user_id)
-        family_id = profile_res.data[0].get('family_id')
-        self.repository.delete_budget(budget_id, family_id)
+    async def delete_budget(self, user_id: str, family_id: Optional[str], budget_id: str):
+        await self.repository.delete_budget(budget_id, family_id)
+        notify_family_change(family_id, "budgets")
         return True
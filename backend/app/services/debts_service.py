@@ -1,28 +1,26 @@
 from datetime import datetime
 from typing import List, Optional
+from fastapi.encoders import jsonable_encoder
+from app.core.changes import notify_family_change
 from app.services.base import BaseService
+from app.services import reference_data
 from app.repositories.debts_repository import DebtsRepository
 
 class DebtsService(BaseService):
     def __init__(self, repository: DebtsRepository):
         super().__init__(repository)
 
-    async def get_debts(self, user_id: str):
-        profile_res = self.repository.get_user_profile(user_id)
-        if not profile_res.data or not profile_res.data[0].get('family_id'):
+    async def get_debts(self, user_id: str, family_id: Optional[str]):
+        if not family_id:
             return []
         
-        family_id = profile_res.data[0]['family_id']
-        res = self.repository.get_debts_by_family(family_id)
+        res = await self.repository.get_debts_by_family(family_id)
         return res.data or []
 
-    async def create_debt(self, user_id: str, debt_data: dict):
-        profile_res = self.repository.get_user_profile(user_id)
-        if not profile_res.data or not profile_res.data[0].get('family_id'):
+    async def create_debt(self, user_id: str, family_id: Optional[str], debt_data: dict):
+        if not family_id:
             raise Exception("User not in a family")
         
-        family_id = profile_res.data[0]['family_id']
-        
         data = {**debt_data}
         data['family_id'] = family_id
         if data.get('due_date') and isinstance(data['due_date'], datetime):
@@ -31,62 +29,47 @@ class DebtsService(BaseService):
         # Auto-assign category
         if not data.get('category_id'):
             default_name = 'Préstamos Recibidos' if data.get('type') == 'to_pay' else 'Préstamos Otorgados'
-            cat_res = self.repository.get_default_category(default_name)
-            if cat_res.data:
-                data['category_id'] = cat_res.data[0]['id']
+            data['category_id'] = await reference_data.get_default_category_id(default_name)
 
-        res = self.repository.insert_debt(data)
-        if not res.data:
-            raise Exception("Failed to create debt")
-        
-        new_debt = res.data[0]
         account_id = data.get('account_id')
-        
+        tx_data = None
         if account_id:
-            tx_type = 'income' if new_debt['type'] == 'to_pay' else 'expense'
-            impact = new_debt['total_amount'] if tx_type == 'income' else -new_debt['total_amount']
-            
-            # Create Transaction
             tx_data = {
-                "family_id": family_id,
-                "user_id": str(user_id),
                 "account_id": str(account_id),
-                "category_id": str(new_debt['category_id']) if new_debt.get('category_id') else None,
-                "description": f"[{'PRESTAMO RECIBIDO' if new_debt['type'] == 'to_pay' else 'PRESTAMO OTORGADO'}] {new_debt['description']}",
-                "amount": new_debt['total_amount'],
-                "type": tx_type,
+                "category_id": str(data['category_id']) if data.get('category_id') else None,
+                "description": f"[{'PRESTAMO RECIBIDO' if data['type'] == 'to_pay' else 'PRESTAMO OTORGADO'}] {data['description']}",
+                "amount": data['total_amount'],
+                "type": 'income' if data['type'] == 'to_pay' else 'expense',
                 "date": datetime.utcnow().isoformat()
             }
-            self.repository.insert_transaction(tx_data)
-            
-            # Update Account
-            acc_res = self.repository.get_account_balance(str(account_id))
-            if acc_res.data:
-                new_balance = float(acc_res.data[0]['balance']) + impact
-                self.repository.update_account_balance(str(account_id), new_balance)
 
+        # Debt, principal transaction and balance update happen in one database transaction
+        res = await self.repository.create_debt_atomic(family_id, str(user_id), jsonable_encoder(data), jsonable_encoder(tx_data))
+        new_debt = self._rpc_row(res)
+        if not new_debt:
+            raise Exception("Failed to create debt")
+
+        if account_id:
+            notify_family_change(family_id, "transactions", "accounts")
+        notify_family_change(family_id, "debts")
         return new_debt
 
-    async def update_debt(self, user_id: str, debt_id: str, updates: dict):
-        profile_res = self.repository.get_user_profile(user_id)
-        family_id = profile_res.data[0].get('family_id')
-        res = self.repository.update_debt(debt_id, family_id, updates)
+    async def update_debt(self, user_id: str, family_id: Optional[str], debt_id: str, updates: dict):
+        res = await self.repository.update_debt(debt_id, family_id, updates)
         if not res.data:
             raise Exception("Debt not found or unauthorized")
+        notify_family_change(family_id, "debts")
         return res.data[0]
 
-    async def delete_debt(self, user_id: str, debt_id: str):
-        profile_res = self.repository.get_user_profile(user_id)
-        family_id = profile_res.data[0].get('family_id')
-        self.repository.delete_debt(debt_id, family_id)
+    async def delete_debt(self, user_id: str, family_id: Optional[str], debt_id: str):
+        await self.repository.delete_debt(debt_id, family_id)
+        notify_family_change(family_id, "debts")
         return True
 
-    async def pay_debt(self, user_id: str, debt_id: str, payment_data: dict):
-        profile_res = self.repository.get_user_profile(user_id)
-        if not profile_res.data or not profile_res.data[0].get('family_id'):
+    async def pay_debt(self, user_id: str, family_id: Optional[str], debt_id: str, payment_data: dict):
+        if not family_id:
             raise Exception("User not in a family")
         
-        family_id = profile_res.data[0]['family_id']
         amount = float(payment_data['amount'])
         account_id = payment_data['accountId']
         category_id = payment_data.get('categoryId')
@@ -94,13 +77,8 @@ class DebtsService(BaseService):
         debt_type = payment_data['type']
         receipt_url = payment_data.get('receiptUrl')
 
-        # 1. Create Transaction
         tx_type = 'expense' if debt_type == 'to_pay' else 'income'
-        impact = -amount if tx_type == 'expense' else amount
-
         tx_data = {
-            "family_id": family_id,
-            "user_id": str(user_id),
             "account_id": str(account_id),
             "category_id": str(category_id) if category_id else None,
             "description": f"[{'PAGO DEUDA' if debt_type == 'to_pay' else 'COBRO DEUDA'}] {description or 'Pago de deuda'}",
@@ -113,30 +91,19 @@ class DebtsService(BaseService):
         # Auto-assign category if missing
         if not tx_data["category_id"]:
             default_name = 'Préstamos Otorgados' if debt_type == 'to_pay' else 'Préstamos Recibidos'
-            cat_res = self.repository.get_default_category(default_name)
-            if cat_res.data:
-                tx_data["category_id"] = cat_res.data[0]['id']
+            tx_data["category_id"] = await reference_data.get_default_category_id(default_name)
 
-        self.repository.insert_transaction(tx_data)
-
-        # 2. Update Account Balance
-        acc_res = self.repository.get_account_balance(str(account_id))
-        if acc_res.data:
-            new_balance = float(acc_res.data[0]['balance']) + impact
-            self.repository.update_account_balance(str(account_id), new_balance)
-
-        # 3. Update Debt
-        debt_res = self.repository.get_debt_by_id(debt_id, family_id)
-        if not debt_res.data:
+        # Transaction, balance update and the remaining-amount decrement happen in one database transaction
+        res = await self.repository.pay_debt_atomic(family_id, str(user_id), debt_id, jsonable_encoder(tx_data))
+        debt = self._rpc_row(res)
+        if not debt:
             raise Exception("Debt not found")
-        
-        debt = debt_res.data[0]
-        new_remaining = max(0, float(debt['remaining_amount']) - amount)
-        new_status = 'paid' if new_remaining <= 0 else 'active'
 
-        self.repository.update_debt(debt_id, family_id, {
-            "remaining_amount": new_remaining,
-            "status": new_status
-        })
+        notify_family_change(family_id, "transactions", "accounts", "debts")
+        return {"status": "success", "new_remaining": float(debt['remaining_amount'])}
 
-        return {"status": "success", "new_remaining": new_remaining}
+    def _rpc_row(self, res):
+        # Functions returning a single composite come back as an object, not a list
+        if isinstance(res.data, list):
+            return res.data[0] if res.data else None
+        return res.data
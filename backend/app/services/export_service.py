@@ -0,0 +1,172 @@
+import csv
+import functools
+import io
+import json
+import tempfile
+import time
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+import anyio
+import anyio.from_thread
+import anyio.to_thread
+from app.core.config import settings
+from app.core.metrics import EXPORT_DURATION
+
+EXPORT_COLUMNS = [
+    "id", "date", "type", "description", "amount", "category_name",
+    "account_name", "user_name", "account_id", "target_account_id", "receipt_url",
+]
+
+PDF_HEADER = ["Fecha", "Tipo", "Descripción", "Monto", "Categoría", "Cuenta", "Usuario", "Recibo"]
+
+@functools.lru_cache(maxsize=1)
+def _table_style():
+    # reportlab is imported by the first PDF export rather than at startup
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+    return TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("LEFTPADDING", (0, 0), (-1, -1), 3),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 3),
+    ])
+
+# Bounds how many PDFs are rendered at once in the worker threads
+_render_limiter: Optional[anyio.CapacityLimiter] = None
+
+class _LazyFlowables(list):
+    """
+    Flowable list that refills itself from `next_chunk` whenever it runs dry.
+    SimpleDocTemplate.build consumes flowables from the front while
+    `len(flowables)` is non-zero, so only the current chunk is ever alive.
+    """
+    def __init__(self, next_chunk: Callable[[], Optional[list]]):
+        super().__init__()
+        self._next_chunk = next_chunk
+        self._exhausted = False
+
+    def __len__(self):
+        while not self._exhausted and super().__len__() == 0:
+            chunk = self._next_chunk()
+            if chunk is None:
+                self._exhausted = True
+            else:
+                self.extend(chunk)
+        return super().__len__()
+
+def _pdf_row(tx: Dict, styles) -> list:
+    from reportlab.platypus import Paragraph
+    receipt_cell = "-"
+    if tx.get("receipt_url"):
+        receipt_cell = Paragraph(f'<a href="{tx.get("receipt_url")}" color="blue">Ver</a>', styles["BodyText"])
+
+    return [
+        tx.get("date")[:10],
+        tx.get("type"),
+        Paragraph(tx.get("description") or "", styles['Normal']),
+        f"${tx.get('amount'):,.2f}",
+        tx.get("category_name") or "-",
+        tx.get("account_name") or "-",
+        tx.get("user_name") or "-",
+        receipt_cell
+    ]
+
+def _build_pdf(next_page: Callable[[], Optional[List[Dict]]], out) -> None:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Table
+
+    table_style = _table_style()
+    styles = getSampleStyleSheet()
+    styles["BodyText"].alignment = 1 # Center
+    chunk_size = settings.EXPORT_PDF_CHUNK_ROWS
+    wrote_any = False
+
+    def next_chunk():
+        nonlocal wrote_any
+        page = next_page()
+        if page is None:
+            if wrote_any:
+                return None
+            wrote_any = True
+            return [Table([PDF_HEADER], style=table_style)]
+
+        wrote_any = True
+        # Several small tables split far cheaper than one table per export
+        tables = []
+        for start in range(0, len(page), chunk_size):
+            data = [PDF_HEADER] + [_pdf_row(tx, styles) for tx in page[start:start + chunk_size]]
+            tables.append(Table(data, repeatRows=1, style=table_style))
+        return tables
+
+    doc = SimpleDocTemplate(out, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=18)
+    doc.build(_LazyFlowables(next_chunk))
+
+async def render_transactions_pdf(pages: AsyncIterator[List[Dict]]):
+    """
+    Renders enriched transaction pages into a PDF spooled to a temp file.
+    The CPU-bound layout runs in a worker thread, which pulls pages from the
+    event loop as it needs them, so only one page is held in memory at once.
+    """
+    global _render_limiter
+    if _render_limiter is None:
+        _render_limiter = anyio.CapacityLimiter(settings.EXPORT_MAX_CONCURRENCY)
+
+    async def fetch_next():
+        try:
+            return await pages.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def next_page():
+        return anyio.from_thread.run(fetch_next)
+
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.EXPORT_SPOOL_MAX_BYTES)
+    started_at = time.perf_counter()
+    try:
+        await anyio.to_thread.run_sync(_build_pdf, next_page, spool, limiter=_render_limiter)
+    except BaseException:
+        spool.close()
+        raise
+    EXPORT_DURATION.labels("pdf").observe(time.perf_counter() - started_at)
+    spool.seek(0)
+    return spool
+
+def iter_file(spool, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Streams a spooled file and closes it once fully sent."""
+    try:
+        while True:
+            chunk = spool.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        spool.close()
+
+async def iter_csv(pages: AsyncIterator[List[Dict]]) -> AsyncIterator[str]:
+    """Yields the CSV header right away, then one block of rows per page."""
+    started_at = time.perf_counter()
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    async for page in pages:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(page)
+        yield buffer.getvalue()
+    EXPORT_DURATION.labels("csv").observe(time.perf_counter() - started_at)
+
+async def iter_ndjson(pages: AsyncIterator[List[Dict]]) -> AsyncIterator[str]:
+    """Yields one JSON document per line, one block per page."""
+    started_at = time.perf_counter()
+    async for page in pages:
+        yield "".join(
+            json.dumps({key: tx.get(key) for key in EXPORT_COLUMNS}, ensure_ascii=False, default=str) + "\n"
+            for tx in page
+        )
+    EXPORT_DURATION.labels("ndjson").observe(time.perf_counter() - started_at)
@@ -0,0 +1,23 @@
+from typing import Optional
+from app.core.cache import TTLCache, MISSING
+from app.core.config import settings
+from app.repositories.profiles_repository import ProfilesRepository
+
+# user_id -> family_id (None when the user has no family yet)
+family_id_cache = TTLCache(maxsize=settings.FAMILY_CACHE_SIZE, ttl=settings.FAMILY_CACHE_TTL, name="family_id")
+
+async def resolve_family_id(user_id: str) -> Optional[str]:
+    key = str(user_id)
+    family_id = family_id_cache.get(key, MISSING)
+    if family_id is not MISSING:
+        return family_id
+
+    res = await ProfilesRepository().get_family_id(key)
+    family_id = res.data[0].get('family_id') if res.data else None
+    family_id = str(family_id) if family_id else None
+    family_id_cache.set(key, family_id)
+    return family_id
+
+def invalidate_family_id(user_id: str):
+    """Must be called whenever a user's family membership changes."""
+    family_id_cache.pop(str(user_id))
@@ -1,8 +1,11 @@
 import random
 import string
 from typing import List, Optional
+from app.core.changes import notify_family_change
 from app.services.base import BaseService
 from app.repositories.family_repository import FamilyRepository
+from app.services.family_context import invalidate_family_id
+from app.services import reference_data
 
 class FamilyService(BaseService):
     def __init__(self, repository: FamilyRepository):
@@ -15,48 +18,43 @@ class FamilyService(BaseService):
         for _ in range(3):
             code = self._generate_invite_code()
             try:
-                res = self.repository.create_family(name, code)
+                res = await self.repository.create_family(name, code)
                 if res.data:
                     new_family = res.data[0]
-                    self.repository.update_user_family(user_id, new_family['id'])
+                    await self.repository.update_user_family(user_id, new_family['id'])
+                    invalidate_family_id(user_id)
+                    notify_family_change(new_family['id'], "members", "account_meta")
                     return new_family
             except Exception:
                 continue
         raise Exception("Failed to generate unique invite code")
 
     async def join_family(self, user_id: str, invite_code: str):
-        res = self.repository.find_family_by_code(invite_code)
+        res = await self.repository.find_family_by_code(invite_code)
         if not res.data:
             raise Exception("Invalid invite code")
         
         family = res.data[0]
-        self.repository.update_user_family(user_id, family['id'])
+        await self.repository.update_user_family(user_id, family['id'])
+        invalidate_family_id(user_id)
+        notify_family_change(family['id'], "members", "account_meta")
         return family
 
-    async def leave_family(self, user_id: str):
-        self.repository.update_user_family(user_id, None)
+    async def leave_family(self, user_id: str, family_id: Optional[str] = None):
+        await self.repository.update_user_family(user_id, None)
+        invalidate_family_id(user_id)
+        notify_family_change(family_id, "members", "account_meta")
         return True
 
-    async def get_family_members(self, user_id: str):
-        profile_res = self.repository.get_user_profile(user_id)
-        if not profile_res.data:
-            return []
-        
-        family_id = profile_res.data[0].get('family_id')
+    async def get_family_members(self, user_id: str, family_id: Optional[str]):
         if not family_id:
             return []
 
-        res = self.repository.get_family_members(family_id)
-        return res.data or []
+        return await reference_data.get_members(family_id)
 
-    async def get_my_family(self, user_id: str):
-        profile_res = self.repository.get_user_profile(user_id)
-        if not profile_res.data:
-            return []
-        
-        family_id = profile_res.data[0].get('family_id')
+    async def get_my_family(self, user_id: str, family_id: Optional[str]):
         if not family_id:
             return []
 
-        res = self.repository.get_family_by_id(family_id)
+        res = await self.repository.get_family_by_id(family_id)
         return res.data or []
@@ -0,0 +1,33 @@
+import hashlib
+from typing import Dict, Iterable
+from app.core.cache import TTLCache, MISSING
+from app.core.changes import on_family_change
+from app.core.config import settings
+from app.repositories.versions_repository import VersionsRepository
+
+# family_id -> {entity: version}. Writes in this process drop the entry right
+# away; the short TTL bounds how long writes made by other workers go unseen.
+family_versions_cache = TTLCache(maxsize=settings.FAMILY_VERSION_CACHE_SIZE, ttl=settings.FAMILY_VERSION_CACHE_TTL, name="family_versions")
+
+@on_family_change
+def _invalidate_versions(family_id: str, entity: str):
+    family_versions_cache.pop(family_id)
+
+async def get_family_versions(family_id: str) -> Dict[str, int]:
+    versions = family_versions_cache.get(family_id, MISSING)
+    if versions is not MISSING:
+        return versions
+
+    res = await VersionsRepository().get_family_versions(family_id)
+    versions = {row['entity']: int(row['version']) for row in (res.data or [])}
+    family_versions_cache.set(family_id, versions)
+    return versions
+
+def compute_etag(versions: Dict[str, int], entities: Iterable[str], *vary: str) -> str:
+    """
+    Weak ETag for a list response: the versions of the entities it is built
+    from plus whatever else the representation depends on (caller, query).
+    """
+    parts = [f"{entity}:{versions.get(entity, 0)}" for entity in entities]
+    digest = hashlib.blake2b("|".join([*parts, *vary]).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
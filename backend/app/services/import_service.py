@@ -0,0 +1,162 @@
+import codecs
+import csv
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import UploadFile
+
+READ_CHUNK_BYTES = 64 * 1024
+
+# Accepted CSV headers (lowercased) -> import field. The export's own columns
+# are included so a CSV export can be re-imported as is.
+CSV_FIELDS = {
+    "date": "date", "fecha": "date",
+    "description": "description", "descripción": "description", "descripcion": "description",
+    "amount": "amount", "monto": "amount",
+    "type": "type", "tipo": "type",
+    "category_id": "category_id",
+    "category": "category_name", "category_name": "category_name", "categoría": "category_name", "categoria": "category_name",
+    "account_id": "account_id",
+    "account": "account_name", "account_name": "account_name", "cuenta": "account_name",
+    "target_account_id": "target_account_id",
+    "receipt_url": "receipt_url",
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%Y%m%d", "%d-%m-%Y", "%m/%d/%Y")
+
+_OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+_OFX_BLOCK_END = "</STMTTRN>"
+
+ImportRow = Tuple[int, Dict[str, Optional[str]]]
+
+def detect_format(filename: Optional[str], requested: Optional[str] = None) -> str:
+    fmt = (requested or (filename or "").rsplit(".", 1)[-1]).lower()
+    if fmt in ("ofx", "qfx"):
+        return "ofx"
+    if fmt in ("csv", "txt"):
+        return "csv"
+    raise ValueError("Unsupported import format; upload a .csv or .ofx file")
+
+async def iter_text(upload: UploadFile, encoding: str = "utf-8-sig") -> AsyncIterator[str]:
+    """Decodes the upload chunk by chunk; multi-byte characters may span chunks."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    while True:
+        chunk = await upload.read(READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+async def iter_lines(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Lines with their endings kept, so quoted newlines survive re-joining."""
+    pending = ""
+    async for text in chunks:
+        lines = (pending + text).splitlines(keepends=True)
+        pending = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+async def iter_csv_rows(upload: UploadFile) -> AsyncIterator[ImportRow]:
+    """
+    Rows of a CSV upload keyed by import field, numbered by their line in
+    the file. Both ',' and ';' delimiters are accepted (sniffed from the header).
+    """
+    delimiter = None
+    header: List[Optional[str]] = []
+    record = ""
+    record_line = line_no = 0
+
+    async for line in iter_lines(iter_text(upload)):
+        line_no += 1
+        if not record:
+            record_line = line_no
+        record += line
+        # A quoted field may contain newlines; wait for its closing quote
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+
+        if delimiter is None:
+            delimiter = ";" if text.count(";") > text.count(",") else ","
+            header = [CSV_FIELDS.get(name.strip().lower()) for name in next(csv.reader([text], delimiter=delimiter))]
+            if "amount" not in header or "date" not in header:
+                raise ValueError("CSV header must include at least 'date' and 'amount' columns")
+            continue
+
+        values = next(csv.reader([text], delimiter=delimiter), [])
+        row = {field: value.strip() or None for field, value in zip(header, values) if field}
+        yield record_line, row
+
+async def iter_ofx_rows(upload: UploadFile) -> AsyncIterator[ImportRow]:
+    """
+    <STMTTRN> entries of an OFX/QFX statement (SGML 1.x or XML 2.x). Amounts
+    are signed in OFX, so the type is taken from the sign.
+    """
+    pending = ""
+    index = 0
+    async for text in iter_text(upload, encoding="latin-1"):
+        pending += text
+        while True:
+            end = pending.find(_OFX_BLOCK_END)
+            if end == -1:
+                break
+            start = pending.rfind("<STMTTRN>", 0, end)
+            block = pending[start:end] if start != -1 else ""
+            pending = pending[end + len(_OFX_BLOCK_END):]
+            if not block:
+                continue
+            index += 1
+            fields = {tag.upper(): value.strip() for tag, value in _OFX_FIELD.findall(block)}
+            yield index, {
+                "date": (fields.get("DTPOSTED") or "")[:8] or None,
+                "amount": fields.get("TRNAMT"),
+                "description": fields.get("NAME") or fields.get("MEMO") or fields.get("PAYEE"),
+                "external_id": fields.get("FITID"),
+            }
+        # Keep only a possibly incomplete trailing block
+        tail = pending.rfind("<STMTTRN>")
+        pending = pending[tail:] if tail != -1 else pending[-len(_OFX_BLOCK_END):]
+
+def parse_amount(raw: str) -> Decimal:
+    """
+    Accepts '1234.56', '-1,234.56', '1.234,56', '3.000.000', '1.500' and currency
+    symbols. A lone separator followed by exactly three digits is a thousands
+    separator (COP amounts have no decimals), anything else is the decimal one.
+    """
+    value = re.sub(r"[^\d,.\-]", "", raw)
+    if "," in value and "." in value:
+        # Whichever separator comes last is the decimal one
+        if value.rfind(",") > value.rfind("."):
+            value = value.replace(".", "").replace(",", ".")
+        else:
+            value = value.replace(",", "")
+    elif "," in value:
+        whole, _, frac = value.rpartition(",")
+        value = f"{whole.replace(',', '')}.{frac}" if len(frac) <= 2 else value.replace(",", "")
+    elif value.count(".") > 1 or len(value.rpartition(".")[2]) == 3:
+        value = value.replace(".", "")
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount '{raw}'")
+
+def parse_date(raw: str) -> str:
+    try:
+        return datetime.fromisoformat(raw).isoformat()
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(raw, fmt).isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date '{raw}'")
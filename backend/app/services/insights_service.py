@@ -0,0 +1,139 @@
+import asyncio
+import weakref
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import anyio.to_thread
+from app.core.cache import TTLCache
+from app.core.changes import on_family_change
+from app.core.config import settings
+from app.services.base import BaseService
+from app.services import reference_data
+from app.repositories.insights_repository import InsightsRepository
+
+# (family_id, user_id, day) -> insights
+insights_cache = TTLCache(maxsize=settings.INSIGHTS_CACHE_SIZE, ttl=settings.INSIGHTS_CACHE_TTL, name="insights")
+
+INSIGHTS_ENTITIES = {"transactions", "accounts", "budgets", "categories"}
+
+# (family_id, user_id) -> {detector, watermark, seen}. New rows are folded in
+# incrementally; the TTL forces a periodic rebuild so edits and deletes of
+# older expenses are eventually reflected. created_at is when the writing
+# transaction started, not when it committed, so each read goes back
+# RECURRING_WATERMARK_SLACK before the watermark and `seen` (ids of rows inside
+# that window) keeps rows from being folded in twice.
+recurring_cache = TTLCache(maxsize=settings.RECURRING_CACHE_SIZE, ttl=settings.RECURRING_REBUILD_TTL, name="recurring")
+
+# family_id -> lock serializing reads of a family's detectors and watermarks, so
+# concurrent calls never fold the same rows in twice. Unused locks are collected.
+_recurring_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def _recurring_lock(family_id: str) -> asyncio.Lock:
+    lock = _recurring_locks.get(family_id)
+    if lock is None:
+        lock = _recurring_locks[family_id] = asyncio.Lock()
+    return lock
+
+@on_family_change
+def _invalidate_insights(family_id: str, entity: str):
+    if entity in INSIGHTS_ENTITIES:
+        insights_cache.pop_where(lambda key: key[0] == family_id)
+    # Balance changes do not matter here, only which accounts exist and whose they are
+    if entity == "account_meta":
+        recurring_cache.pop_where(lambda key: key[0] == family_id)
+
+class InsightsService(BaseService):
+    def __init__(self, repository: InsightsRepository):
+        super().__init__(repository)
+
+    async def get_insights(self, user_id: str, family_id: Optional[str], today: Optional[date] = None) -> List[Dict]:
+        # The numpy-backed analytics load on first use, not at startup
+        from app.services.analytics import TransactionFrame, compute_insights, previous_month_start, welcome_insight
+        if not family_id:
+            return [welcome_insight()]
+
+        today = today or datetime.utcnow().date()
+        key = (family_id, str(user_id), today.isoformat())
+        cached = insights_cache.get(key)
+        if cached is not None:
+            return cached
+
+        accounts, categories, budget_res = await asyncio.gather(
+            reference_data.get_accounts(family_id),
+            reference_data.get_categories(family_id),
+            self.repository.get_monthly_budgets(family_id, today.year, today.month),
+        )
+        account_ids = self._visible_account_ids(user_id, accounts)
+
+        rows = []
+        if account_ids:
+            rows = await self._fetch_transaction_columns(
+                account_ids,
+                previous_month_start(today).isoformat(),
+                (today + timedelta(days=1)).isoformat(),
+            )
+
+        category_names = {str(c['id']): c['name'] for c in categories}
+        insights = compute_insights(TransactionFrame.from_rows(rows), budget_res.data or [], category_names, today)
+        insights_cache.set(key, insights)
+        return insights
+
+    async def get_recurring_expenses(self, user_id: str, family_id: Optional[str], today: Optional[date] = None) -> List[Dict]:
+        from app.services.recurring import RecurringDetector
+        if not family_id:
+            return []
+
+        today = today or datetime.utcnow().date()
+        account_ids = self._visible_account_ids(user_id, await reference_data.get_accounts(family_id))
+        if not account_ids:
+            return []
+
+        key = (family_id, str(user_id))
+        async with _recurring_lock(family_id):
+            state = recurring_cache.get(key)
+            started_at = datetime.now(timezone.utc)
+            start_date = (today - timedelta(days=settings.RECURRING_LOOKBACK_DAYS)).isoformat()
+            if state is None:
+                rows = await self._fetch_expense_history(account_ids, start_date, None)
+                # A full fit takes hundreds of ms on large histories; keep it off the event loop
+                detector = await anyio.to_thread.run_sync(RecurringDetector().fit, rows)
+                state = {"detector": detector, "watermark": None, "seen": {}}
+                recurring_cache.set(key, state)
+            else:
+                # Only rows created since shortly before the last call; the state is
+                # updated in place so the entry keeps its original rebuild deadline
+                window_start = state["watermark"] - timedelta(seconds=settings.RECURRING_WATERMARK_SLACK)
+                rows = await self._fetch_expense_history(account_ids, start_date, window_start.isoformat())
+                state["detector"].update([row for row in rows if row['id'] not in state["seen"]])
+
+            created = {row['id']: datetime.fromisoformat(row['created_at']) for row in rows}
+            # Database timestamps where there are any; this process's clock may differ
+            watermarks = [*created.values(), *([state["watermark"]] if state["watermark"] else [])]
+            state["watermark"] = max(watermarks) if watermarks else started_at
+            window_start = state["watermark"] - timedelta(seconds=settings.RECURRING_WATERMARK_SLACK)
+            state["seen"] = {row_id: created_at for row_id, created_at in {**state["seen"], **created}.items() if created_at >= window_start}
+
+            return state["detector"].detect(today)
+
+    async def _fetch_transaction_columns(self, account_ids: List[str], start_date: str, end_date: str) -> List[Dict]:
+        rows: List[Dict] = []
+        page_size = settings.DB_PAGE_SIZE
+        while True:
+            res = await self.repository.get_transaction_columns(account_ids, start_date, end_date, len(rows), page_size)
+            page = res.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+
+    async def _fetch_expense_history(self, account_ids: List[str], start_date: str, created_after: Optional[str]) -> List[Dict]:
+        rows: List[Dict] = []
+        page_size = settings.DB_PAGE_SIZE
+        while True:
+            res = await self.repository.get_expense_history(account_ids, start_date, created_after, len(rows), page_size)
+            page = res.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+
+    def _visible_account_ids(self, user_id: str, accounts: List[Dict]) -> List[str]:
+        # Same visibility as the family scope: joint accounts and the caller's own
+        return [str(a['id']) for a in accounts if not a.get('user_id') or str(a.get('user_id')) == str(user_id)]
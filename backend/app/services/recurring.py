@@ -0,0 +1,196 @@
+"""
+Recurring-expense detection (subscriptions, rent, utilities).
+
+Expenses are grouped by normalized description and category, then split
+into amount clusters wherever consecutive sorted amounts differ by more
+than AMOUNT_CLUSTER_GAP. Each cluster's dates are summarized with
+vectorized interval statistics (count, mean gap, coefficient of variation);
+a cluster is recurring when its gaps are regular and match a known cadence.
+New transactions update their cluster's running statistics in O(1).
+"""
+import string
+import unicodedata
+from bisect import insort
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Hashable, List, Optional
+import numpy as np
+
+# (name, expected gap in days, tolerance in days, minimum occurrences)
+CADENCES = [
+    ("weekly", 7.0, 2.0, 4),
+    ("biweekly", 14.0, 3.0, 3),
+    ("monthly", 30.4, 4.0, 3),
+    ("quarterly", 91.3, 10.0, 4),
+    ("yearly", 365.25, 20.0, 3),
+]
+# Sorted amounts more than 20% apart start a new cluster
+AMOUNT_CLUSTER_GAP = 0.2
+MAX_INTERVAL_CV = 0.25
+
+_NON_LETTERS = str.maketrans({c: " " for c in string.digits + string.punctuation})
+
+_EPOCH = date(1970, 1, 1)
+
+@lru_cache(maxsize=65536)
+def normalize_description(description: str) -> str:
+    """'NETFLIX.COM 10/2026 #123' -> 'netflix com'"""
+    text = description or ""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return " ".join(text.lower().translate(_NON_LETTERS).split())
+
+def _factorize(values) -> np.ndarray:
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        _, codes = np.unique(values, return_inverse=True)
+        return codes.astype(np.int64)
+    # Hashing beats sorting Python strings for object columns
+    index: Dict[Hashable, int] = {}
+    return np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int64, count=len(values))
+
+class _Group:
+    __slots__ = ("description", "category_id", "days", "amount_sum", "interval_sum", "interval_sq_sum")
+
+    def __init__(self, description: str, category_id: Optional[str], days: List[int], amount_sum: float, interval_sum: float, interval_sq_sum: float):
+        self.description = description
+        self.category_id = category_id
+        self.days = days
+        self.amount_sum = amount_sum
+        self.interval_sum = interval_sum
+        self.interval_sq_sum = interval_sq_sum
+
+    @property
+    def mean_amount(self) -> float:
+        return self.amount_sum / len(self.days) if self.days else 0.0
+
+    def add(self, day: int, amount: float):
+        self.amount_sum += amount
+        if not self.days or day >= self.days[-1]:
+            if self.days:
+                gap = day - self.days[-1]
+                self.interval_sum += gap
+                self.interval_sq_sum += gap * gap
+            self.days.append(day)
+            return
+        # Out-of-order arrival: recompute this group's gaps only
+        insort(self.days, day)
+        gaps = np.diff(np.asarray(self.days, dtype=np.float64))
+        self.interval_sum = float(gaps.sum())
+        self.interval_sq_sum = float((gaps * gaps).sum())
+
+class RecurringDetector:
+    def __init__(self):
+        # (description, category) -> amount clusters
+        self._groups: Dict[Hashable, List[_Group]] = {}
+
+    @staticmethod
+    def _day_numbers(dates: List[str]) -> np.ndarray:
+        return (np.array([d[:10] for d in dates], dtype="datetime64[D]") - np.datetime64(_EPOCH, "D")).astype(np.int64)
+
+    def fit(self, rows: List[Dict]) -> "RecurringDetector":
+        """Builds cluster statistics for a full history of expense rows."""
+        self._groups = {}
+        if not rows:
+            return self
+
+        amounts = np.fromiter((float(r['amount']) for r in rows), dtype=np.float64, count=len(rows))
+        days = self._day_numbers([r['date'] for r in rows])
+        descriptions = [normalize_description(r.get('description')) for r in rows]
+        categories = [str(r.get('category_id') or "") for r in rows]
+        group = _factorize(list(zip(descriptions, categories)))
+
+        # Amount clusters: sort by (group, amount) and cut on large relative jumps
+        by_amount = np.lexsort((amounts, group))
+        g, a = group[by_amount], amounts[by_amount]
+        new_cluster = np.r_[True, (g[1:] != g[:-1]) | (a[1:] > a[:-1] * (1 + AMOUNT_CLUSTER_GAP))]
+        cluster = np.empty(len(rows), dtype=np.int64)
+        cluster[by_amount] = np.cumsum(new_cluster) - 1
+
+        order = np.lexsort((days, cluster))
+        c, d, a = cluster[order], days[order], amounts[order]
+        starts = np.flatnonzero(np.r_[True, c[1:] != c[:-1]])
+        ends = np.r_[starts[1:], len(c)]
+
+        # Gap to the previous row of the same cluster; zero at each cluster start
+        gaps = np.r_[0, np.diff(d)].astype(np.float64)
+        gaps[starts] = 0
+        interval_sums = np.add.reduceat(gaps, starts)
+        interval_sq_sums = np.add.reduceat(gaps * gaps, starts)
+        amount_sums = np.add.reduceat(a, starts)
+
+        first_rows = order[starts].tolist()
+        for i, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+            row = first_rows[i]
+            key = (descriptions[row], categories[row])
+            self._groups.setdefault(key, []).append(_Group(
+                rows[row].get('description') or descriptions[row],
+                categories[row] or None,
+                d[start:end].tolist(),
+                float(amount_sums[i]),
+                float(interval_sums[i]),
+                float(interval_sq_sums[i]),
+            ))
+        return self
+
+    def update(self, rows: List[Dict]):
+        """Folds newly created expense rows into the existing clusters."""
+        if not rows:
+            return
+        for row, day in zip(rows, self._day_numbers([r['date'] for r in rows]).tolist()):
+            amount = float(row['amount'])
+            description = normalize_description(row.get('description'))
+            category = str(row.get('category_id') or "")
+            clusters = self._groups.setdefault((description, category), [])
+            target = None
+            for candidate in clusters:
+                mean = candidate.mean_amount
+                if mean / (1 + AMOUNT_CLUSTER_GAP) <= amount <= mean * (1 + AMOUNT_CLUSTER_GAP):
+                    target = candidate
+                    break
+            if target is None:
+                target = _Group(row.get('description') or description, category or None, [], 0.0, 0.0, 0.0)
+                clusters.append(target)
+            target.add(day, amount)
+
+    def detect(self, today: Optional[date] = None) -> List[Dict]:
+        """Recurring series, most expensive first."""
+        groups = [g for clusters in self._groups.values() for g in clusters if len(g.days) >= 2]
+        if not groups:
+            return []
+
+        counts = np.fromiter((len(g.days) for g in groups), dtype=np.float64, count=len(groups))
+        n_gaps = counts - 1
+        mean_gap = np.fromiter((g.interval_sum for g in groups), dtype=np.float64, count=len(groups)) / n_gaps
+        mean_sq = np.fromiter((g.interval_sq_sum for g in groups), dtype=np.float64, count=len(groups)) / n_gaps
+        std_gap = np.sqrt(np.maximum(mean_sq - mean_gap * mean_gap, 0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cv = np.where(mean_gap > 0, std_gap / mean_gap, np.inf)
+        avg_amount = np.fromiter((g.amount_sum for g in groups), dtype=np.float64, count=len(groups)) / counts
+
+        cadence = np.full(len(groups), -1)
+        for i, (_, expected, tolerance, min_count) in enumerate(CADENCES):
+            match = (np.abs(mean_gap - expected) <= tolerance) & (counts >= min_count) & (cv <= MAX_INTERVAL_CV) & (cadence < 0)
+            cadence[match] = i
+
+        today_number = ((today or date.today()) - _EPOCH).days
+        results = []
+        for i in np.flatnonzero(cadence >= 0)[np.argsort(-avg_amount[cadence >= 0], kind="stable")]:
+            group = groups[i]
+            last_day = group.days[-1]
+            next_day = last_day + round(mean_gap[i])
+            results.append({
+                "description": group.description,
+                "category_id": group.category_id,
+                "cadence": CADENCES[cadence[i]][0],
+                "interval_days": round(float(mean_gap[i]), 1),
+                "average_amount": round(float(avg_amount[i]), 2),
+                "occurrences": len(group.days),
+                "last_date": (_EPOCH + timedelta(days=last_day)).isoformat(),
+                "next_expected_date": (_EPOCH + timedelta(days=next_day)).isoformat(),
+                # Still running if it is not much more than one cycle overdue
+                "active": bool(today_number <= next_day + CADENCES[cadence[i]][2] + mean_gap[i] / 2),
+            })
+        return results
+
+    def __len__(self):
+        return sum(len(clusters) for clusters in self._groups.values())
@@ -0,0 +1,72 @@
+from typing import Dict, List, Optional
+from app.core.cache import TTLCache, MISSING
+from app.core.changes import on_family_change
+from app.core.config import settings
+from app.repositories.reference_repository import ReferenceRepository
+from app.services.family_versions import get_family_versions
+
+# Near-static lookup data shared by every request of a process:
+#   ("default_categories",)     is_default categories, shared by all families
+#   ("categories", family_id)   the family's own categories
+#   ("accounts", family_id)     id, name, type, user_id (no balances, so only
+#                               "account_meta" changes drop it)
+#   ("members", family_id)      id, full_name, email
+# Entries are dropped by the write paths through notify_family_change; the
+# TTL only bounds staleness for writes made by other workers. Accounts are
+# also written outside the API, so that entry is checked against the
+# "account_meta" family version as well.
+reference_cache = TTLCache(maxsize=settings.REFERENCE_CACHE_SIZE, ttl=settings.REFERENCE_CACHE_TTL, name="reference")
+
+DEFAULT_CATEGORIES_KEY = ("default_categories",)
+
+@on_family_change
+def _invalidate_reference_data(family_id: str, entity: str):
+    if entity in ("categories", "members"):
+        reference_cache.pop((entity, family_id))
+    elif entity == "account_meta":
+        reference_cache.pop(("accounts", family_id))
+
+async def _cached(key, fetch) -> List[Dict]:
+    rows = reference_cache.get(key, MISSING)
+    if rows is MISSING:
+        res = await fetch()
+        rows = res.data or []
+        reference_cache.set(key, rows)
+    return rows
+
+async def _cached_versioned(key, family_id: str, entity: str, fetch) -> List[Dict]:
+    """Like _cached, but the entry is only used while the family's version of `entity` is unchanged."""
+    version = (await get_family_versions(family_id)).get(entity, 0)
+    entry = reference_cache.get(key, MISSING)
+    if entry is not MISSING and entry[0] == version:
+        return entry[1]
+    res = await fetch()
+    rows = res.data or []
+    reference_cache.set(key, (version, rows))
+    return rows
+
+async def get_default_categories() -> List[Dict]:
+    return await _cached(DEFAULT_CATEGORIES_KEY, ReferenceRepository().get_default_categories)
+
+async def get_categories(family_id: Optional[str]) -> List[Dict]:
+    """Default categories followed by the family's own ones."""
+    defaults = await get_default_categories()
+    if not family_id:
+        return list(defaults)
+    own = await _cached(("categories", family_id), lambda: ReferenceRepository().get_family_categories(family_id))
+    return [*defaults, *own]
+
+async def get_default_category_id(name: str) -> Optional[str]:
+    for category in await get_default_categories():
+        if category.get('name') == name:
+            return category['id']
+    return None
+
+async def get_accounts(family_id: str) -> List[Dict]:
+    return await _cached_versioned(("accounts", family_id), family_id, "account_meta", lambda: ReferenceRepository().get_family_accounts(family_id))
+
+async def get_members(family_id: str) -> List[Dict]:
+    return await _cached(("members", family_id), lambda: ReferenceRepository().get_family_members(family_id))
+
+def reference_cache_stats() -> dict:
+    return reference_cache.stats()
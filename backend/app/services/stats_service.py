@@ -1,34 +1,54 @@
-from datetime import datetime, timedelta
-from typing import List, Dict
+import time
+from typing import Optional
+from app.core.cache import TTLCache
+from app.core.changes import on_family_change
+from app.core.config import settings
 from app.services.base import BaseService
 from app.repositories.stats_repository import StatsRepository
 
+# (family_id, user_id) -> dashboard summary
+dashboard_cache = TTLCache(maxsize=settings.DASHBOARD_CACHE_SIZE, ttl=settings.DASHBOARD_CACHE_TTL, name="dashboard")
+_recompute = {"count": 0, "total_seconds": 0.0, "last_seconds": 0.0}
+
+DASHBOARD_ENTITIES = {"transactions", "accounts", "debts"}
+
+@on_family_change
+def _invalidate_dashboard(family_id: str, entity: str):
+    if entity in DASHBOARD_ENTITIES:
+        dashboard_cache.pop_where(lambda key: key[0] == family_id)
+
+def dashboard_cache_stats() -> dict:
+    count = _recompute["count"]
+    return {
+        **dashboard_cache.stats(),
+        "recomputes": count,
+        "avg_recompute_ms": (_recompute["total_seconds"] / count * 1000) if count else 0.0,
+        "last_recompute_ms": _recompute["last_seconds"] * 1000,
+    }
+
 class StatsService(BaseService):
     def __init__(self, repository: StatsRepository):
         super().__init__(repository)
 
-    async def get_dashboard_summary(self, user_id: str):
-        # Optimized: Use RPC call to get all stats in one go
-        res = self.repository.get_dashboard_summary_rpc(user_id)
-        if not res.data:
-            return None
-        
-        # res.data might be a list containing the json due to how Supabase returns RPC
-        # or just the dict directly depending on return type. 
-        # Since function returns json, it usually comes as data scalar or list of 1.
-        # Let's handle it safely.
-        
+    async def get_dashboard_summary(self, user_id: str, family_id: Optional[str] = None):
+        key = (family_id, str(user_id))
+        if family_id:
+            cached = dashboard_cache.get(key)
+            if cached is not None:
+                return cached
+
+        started = time.perf_counter()
+        res = await self.repository.get_dashboard_summary_rpc(user_id)
+        elapsed = time.perf_counter() - started
+        _recompute["count"] += 1
+        _recompute["total_seconds"] += elapsed
+        _recompute["last_seconds"] = elapsed
+
+        # The function returns json, which PostgREST hands back as the body itself
         data = res.data
-        if isinstance(data, list) and len(data) > 0:
-            # If function returns TABLE or set, it's a list. 
-            # If function returns JSON, it might be a direct object or list.
-            # Based on experience with supabase-py:
-            # Plpgsql returning JSON often comes as the body itself.
-            pass
-        
-        # Assuming direct return for now, if it fails we check format.
-        # But wait, execute_sql returned [] which means empty?
-        # Ah, execute_sql output was empty because I didn't verify output.
-        # Let's trust the RPC structure.
-        
+        if not data:
+            return None
+
+        if family_id:
+            dashboard_cache.set(key, data)
         return data
@@ -0,0 +1,93 @@
+import base64
+import time
+from typing import Dict, Optional, Tuple
+from app.core.config import settings
+from app.services.base import BaseService
+from app.repositories.sync_repository import SyncRepository
+
+SYNC_ENTITIES = ("transactions", "accounts", "budgets", "debts")
+
+class SyncCursorExpired(Exception):
+    pass
+
+# A position in the change log is (txid, id): the writing transaction's id,
+# then the entry id within it (see get_family_changes in schema.sql)
+def encode_sync_cursor(txid: int, change_id: int) -> str:
+    raw = f"{txid}.{change_id}|{int(time.time())}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_sync_cursor(cursor: str) -> Tuple[int, int, int]:
+    try:
+        position, issued_at = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        txid, sep, change_id = position.partition(".")
+        result = int(txid), int(change_id or 0), int(issued_at)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not sep:
+        # Cursors issued before the log was ordered by transaction id
+        raise SyncCursorExpired("Cursor expired; reload the full lists")
+    return result
+
+class SyncService(BaseService):
+    def __init__(self, repository: SyncRepository):
+        super().__init__(repository)
+
+    async def get_changes(self, user_id: str, family_id: Optional[str], cursor: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+        """
+        Rows inserted, updated or deleted since `cursor`, grouped by entity.
+        Without a cursor only the current head is returned (reset=True): the
+        client loads the full lists after taking it, then syncs from there.
+        Rows the caller cannot see (other members' personal accounts, their
+        transactions and personal budgets) are sent as deletes so clients
+        drop them.
+        """
+        empty = {entity: {"upserts": [], "deletes": []} for entity in SYNC_ENTITIES}
+        if not family_id:
+            return {"cursor": encode_sync_cursor(0, 0), "has_more": False, "reset": True, "changes": empty}
+
+        after_txid = after_id = None
+        if cursor:
+            after_txid, after_id, issued_at = decode_sync_cursor(cursor)
+            # Log entries older than the retention window may have been pruned
+            if time.time() - issued_at > settings.SYNC_RETENTION_DAYS * 86400:
+                raise SyncCursorExpired("Cursor expired; reload the full lists")
+
+        res = await self.repository.get_family_changes(family_id, after_txid, after_id, limit or settings.SYNC_PAGE_SIZE)
+        payload = res.data or {}
+        changes = payload.get("changes") or []
+
+        visible_accounts = None
+        if any(c["entity"] in ("accounts", "transactions") and c.get("data") for c in changes):
+            acc_res = await self.repository.get_accounts_by_family(family_id)
+            visible_accounts = {
+                str(a["id"]) for a in (acc_res.data or [])
+                if a.get("type") == "joint" or str(a.get("user_id")) == str(user_id)
+            }
+
+        grouped = empty
+        for change in changes:
+            entity, data = change["entity"], change.get("data")
+            if data and not self._is_visible(entity, data, user_id, visible_accounts):
+                data = None
+            if data:
+                grouped[entity]["upserts"].append(data)
+            else:
+                grouped[entity]["deletes"].append(change["id"])
+
+        position = payload.get("cursor") or {"txid": after_txid or 0, "id": after_id or 0}
+        return {
+            "cursor": encode_sync_cursor(position["txid"], position["id"]),
+            "has_more": bool(payload.get("has_more")),
+            "reset": cursor is None,
+            "changes": grouped,
+        }
+
+    def _is_visible(self, entity: str, row: Dict, user_id: str, visible_accounts) -> bool:
+        if entity == "accounts":
+            return str(row["id"]) in visible_accounts
+        if entity == "transactions":
+            return row.get("type") == "transfer" or str(row.get("account_id")) in visible_accounts
+        if entity == "budgets":
+            # Same rule as GET /budgets: shared budgets and the caller's personal ones
+            return row.get("user_id") is None or str(row["user_id"]) == str(user_id)
+        return True
@@ -1,167 +1,307 @@
-from datetime import datetime
-from typing import List, Optional, Dict
+import asyncio
+import base64
+from typing import AsyncIterator, List, Optional, Dict, Tuple
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from app.core.config import settings
+from app.core.changes import notify_family_change
+from app.models.transaction import TransactionCreate, TransactionUpdate
 from app.services.base import BaseService
+from app.services import reference_data
+from app.services.balances import transaction_deltas, merge_deltas
+from app.services.import_service import ImportRow, parse_amount, parse_date
 from app.repositories.transactions_repository import TransactionsRepository
 
+def encode_cursor(tx: Dict) -> str:
+    raw = f"{tx['date']}|{tx['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        tx_date, tx_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return tx_date, tx_id
+
+# Type labels accepted in import files (the PDF export uses the Spanish ones)
+IMPORT_TYPES = {
+    "income": "income", "ingreso": "income",
+    "expense": "expense", "gasto": "expense",
+    "transfer": "transfer", "transferencia": "transfer",
+}
+
 class TransactionsService(BaseService):
     def __init__(self, repository: TransactionsRepository):
         super().__init__(repository)
 
-    async def create_transaction(self, user_id: str, tx_data: dict):
-        profile_res = self.repository.get_user_profile(user_id)
-        if not profile_res.data or not profile_res.data[0].get('family_id'):
+    async def create_transaction(self, user_id: str, family_id: Optional[str], tx_data: dict):
+        if not family_id:
              raise Exception("User does not belong to a family")
         
-        family_id = profile_res.data[0]['family_id']
-        
-        data = {**tx_data}
-        data['user_id'] = str(user_id)
-        data['family_id'] = family_id
-        if isinstance(data.get('date'), datetime):
-            data['date'] = data['date'].isoformat()
-            
-        res = self.repository.insert_transaction(data)
-        if not res.data:
+        # Insert and balance update happen in one database transaction
+        res = await self.repository.create_transaction_atomic(family_id, str(user_id), jsonable_encoder(tx_data))
+        row = self._rpc_row(res)
+        if not row:
             raise Exception("Failed to create transaction")
-        
-        # Update Accounts
-        amount = data['amount']
-        impact = -amount if data['type'] in ['expense', 'transfer'] else amount
-        
-        await self._update_account_balance(data['account_id'], impact)
+        notify_family_change(family_id, "transactions", "accounts")
+        return row
 
-        if data['type'] == 'transfer' and data.get('target_account_id'):
-            await self._update_account_balance(data['target_account_id'], amount)
+    async def get_transactions(self, user_id: str, family_id: Optional[str], scope: str = "family", start_date: str = None, end_date: str = None, limit: int = None):
+        transactions, _ = await self.get_transactions_page(user_id, family_id, scope, start_date, end_date, limit)
+        return transactions
 
-        return res.data[0]
+    async def get_transactions_page(self, user_id: str, family_id: Optional[str], scope: str = "family", start_date: str = None, end_date: str = None, limit: int = None, cursor: str = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        One page of visible transactions ordered by (date, id) desc, plus the
+        cursor for the next page (None when this is the last one). Without a
+        limit, every remaining row up to TRANSACTIONS_UNPAGED_MAX_ROWS is returned.
+        """
+        if not family_id:
+             return [], None
 
-    async def get_transactions(self, user_id: str, scope: str = "family", start_date: str = None, end_date: str = None, limit: int = None):
-        profile_res = self.repository.get_user_profile(user_id)
-        if not profile_res.data or not profile_res.data[0].get('family_id'):
-             return []
-        
-        family_id = profile_res.data[0]['family_id']
-        
-        transactions_data = []
-        if scope == "personal":
-            acc_res = self.repository.db.table("accounts").select("id").eq("user_id", str(user_id)).execute()
-            personal_account_ids = [a['id'] for a in (acc_res.data or [])]
-            if not personal_account_ids:
-                return []
-            
-            res = self.repository.query_transactions({"account_id": personal_account_ids})
-            transactions_data = res.data or []
-        else:
-            # Family Scope
-            all_accounts_res = self.repository.get_accounts_by_family(family_id)
-            all_accounts = all_accounts_res.data or []
-            
-            valid_account_ids = [acc['id'] for acc in all_accounts if not acc.get('user_id') or str(acc.get('user_id')) == str(user_id)]
-
-            # 1. Transactions from allowed accounts
-            tx_allowed = []
-            if valid_account_ids:
-                filters = {"account_id": valid_account_ids}
-                # Date filtering needs to be handled in query_transactions or similar
-                # For simplicity, I'll use the repository db directly for complex filters if needed
-                query = self.repository.db.table("transactions").select("*").in_("account_id", valid_account_ids)
-                if start_date: query = query.gte("date", start_date)
-                if end_date: query = query.lte("date", end_date)
-                tx_allowed = query.order("date", desc=True).execute().data or []
-
-            # 2. Transfers for family
-            query_transfers = self.repository.db.table("transactions").select("*").eq("family_id", family_id).eq("type", "transfer")
-            if start_date: query_transfers = query_transfers.gte("date", start_date)
-            if end_date: query_transfers = query_transfers.lte("date", end_date)
-            tx_transfers = query_transfers.order("date", desc=True).execute().data or []
-
-            # 3. Merge
-            combined = {t['id']: t for t in tx_allowed}
-            for t in tx_transfers:
-                combined[t['id']] = t
-                
-            transactions_data = list(combined.values())
-            transactions_data.sort(key=lambda x: x['date'], reverse=True)
-            if limit:
-                transactions_data = transactions_data[:limit]
-
-        return await self._enrich_transactions(family_id, transactions_data)
-
-    async def update_transaction(self, user_id: str, transaction_id: str, updates: dict):
-        profile_res = self.repository.get_user_profile(user_id)
-        family_id = profile_res.data[0]['family_id']
-
-        old_tx_res = self.repository.get_transaction_by_id(transaction_id)
-        if not old_tx_res.data:
-            raise Exception("Transaction not found")
-        
-        old_tx = old_tx_res.data[0]
-        if str(old_tx['family_id']) != str(family_id):
-            raise Exception("Not authorized")
-
-        # Reverse Old Impact
-        old_impact = -old_tx['amount'] if old_tx['type'] in ['expense', 'transfer'] else old_tx['amount']
-        await self._update_account_balance(old_tx['account_id'], -old_impact)
-        if old_tx['type'] == 'transfer' and old_tx.get('target_account_id'):
-            await self._update_account_balance(old_tx['target_account_id'], -old_tx['amount'])
-
-        # Prepare Updates
-        data = {**updates}
-        if 'date' in data and isinstance(data['date'], datetime):
-            data['date'] = data['date'].isoformat()
-        
-        new_tx_state = {**old_tx, **data}
-        
-        # Apply New Impact
-        new_impact = -new_tx_state['amount'] if new_tx_state['type'] in ['expense', 'transfer'] else new_tx_state['amount']
-        await self._update_account_balance(new_tx_state['account_id'], new_impact)
-        if new_tx_state['type'] == 'transfer' and new_tx_state.get('target_account_id'):
-            await self._update_account_balance(new_tx_state['target_account_id'], new_tx_state['amount'])
-
-        res = self.repository.update_transaction(transaction_id, data)
-        return res.data[0]
-
-    async def delete_transaction(self, user_id: str, transaction_id: str):
-        profile_res = self.repository.get_user_profile(user_id)
-        family_id = profile_res.data[0]['family_id']
-
-        tx_res = self.repository.get_transaction_by_id(transaction_id)
-        if not tx_res.data:
-            raise Exception("Transaction not found")
-        
-        transaction = tx_res.data[0]
-        if str(transaction['family_id']) != str(family_id):
-            raise Exception("Not authorized")
+        if not limit:
+            return await self._collect_transactions(user_id, family_id, scope, start_date, end_date, cursor)
+
+        # Fetch one extra row to know whether another page exists
+        res = await self.repository.get_visible_transactions(
+            family_id,
+            str(user_id),
+            "personal" if scope == "personal" else "family",
+            start_date=start_date,
+            end_date=end_date,
+            cursor=decode_cursor(cursor) if cursor else None,
+            limit=limit + 1,
+        )
+        transactions_data = res.data or []
+
+        next_cursor = None
+        if len(transactions_data) > limit:
+            transactions_data = transactions_data[:limit]
+            next_cursor = encode_cursor(transactions_data[-1])
+
+        return transactions_data, next_cursor
 
-        impact = -transaction['amount'] if transaction['type'] in ['expense', 'transfer'] else transaction['amount']
-        await self._update_account_balance(transaction['account_id'], -impact)
-        if transaction['type'] == 'transfer' and transaction.get('target_account_id'):
-            await self._update_account_balance(transaction['target_account_id'], -transaction['amount'])
+    async def _collect_transactions(self, user_id: str, family_id: str, scope: str, start_date: str, end_date: str, cursor: Optional[str]) -> Tuple[List[Dict], Optional[str]]:
+        # Clients that omit ?limit= compute totals from the whole list, so walk
+        # it here in max-rows sized pages rather than truncating silently
+        max_rows = settings.TRANSACTIONS_UNPAGED_MAX_ROWS
+        page_size = settings.DB_PAGE_SIZE - 1
+        transactions: List[Dict] = []
+        while len(transactions) < max_rows:
+            page, cursor = await self.get_transactions_page(user_id, family_id, scope, start_date, end_date, min(page_size, max_rows - len(transactions)), cursor)
+            transactions.extend(page)
+            if not cursor:
+                break
+        return transactions, cursor
 
-        self.repository.delete_transaction(transaction_id)
+    async def iter_transaction_pages(self, user_id: str, family_id: Optional[str], scope: str = "family", start_date: str = None, end_date: str = None, page_size: int = 1000) -> AsyncIterator[List[Dict]]:
+        """Walks the full (filtered) history page by page using the keyset cursor."""
+        # limit + 1 rows must fit under PostgREST's max-rows or the last page is never detected
+        page_size = min(page_size, settings.DB_PAGE_SIZE - 1)
+        cursor = None
+        while True:
+            page, cursor = await self.get_transactions_page(user_id, family_id, scope, start_date, end_date, page_size, cursor)
+            if page:
+                yield page
+            if not cursor:
+                break
+
+    async def update_transaction(self, user_id: str, family_id: Optional[str], transaction_id: str, updates: dict):
+        # Authorization, balance reversal/re-application and the row update run server-side
+        res = await self.repository.update_transaction_atomic(family_id, transaction_id, jsonable_encoder(updates))
+        notify_family_change(family_id, "transactions", "accounts")
+        return self._rpc_row(res)
+
+    async def delete_transaction(self, user_id: str, family_id: Optional[str], transaction_id: str):
+        await self.repository.delete_transaction_atomic(family_id, transaction_id)
+        notify_family_change(family_id, "transactions", "accounts")
         return True
 
-    async def _update_account_balance(self, account_id: str, delta: float):
-        acc_res = self.repository.get_account_by_id(account_id)
-        if acc_res.data:
-            new_balance = acc_res.data[0]['balance'] + delta
-            self.repository.update_account_balance(account_id, new_balance)
+    async def apply_batch(self, user_id: str, family_id: Optional[str], operations: List[Dict], atomic: bool = False) -> Dict:
+        """
+        Runs an ordered list of create/update/delete operations in one
+        database transaction. Payloads are validated here first; invalid
+        operations are reported without reaching the database.
+        """
+        if not family_id:
+            raise Exception("User does not belong to a family")
+        if len(operations) > settings.TRANSACTIONS_BATCH_MAX_OPS:
+            raise Exception(f"A batch is limited to {settings.TRANSACTIONS_BATCH_MAX_OPS} operations")
 
-    async def _enrich_transactions(self, family_id: str, transactions: List[Dict]):
-        if not transactions: return []
-        
-        cat_res = self.repository.get_categories(family_id)
-        acc_res = self.repository.get_accounts_by_family(family_id)
-        user_ids = list(set([str(t['user_id']) for t in transactions if t.get('user_id')]))
-        prof_res = self.repository.get_profiles_by_ids(user_ids)
-
-        category_map = {str(c['id']): c['name'] for c in (cat_res.data or [])}
-        account_map = {str(a['id']): a['name'] for a in (acc_res.data or [])}
-        profile_map = {str(p['id']): p['full_name'] for p in (prof_res.data or [])}
-
-        for t in transactions:
-            t['category_name'] = category_map.get(str(t.get('category_id')))
-            t['account_name'] = account_map.get(str(t.get('account_id')))
-            t['user_name'] = profile_map.get(str(t.get('user_id')))
-        
-        return transactions
+        results: Dict[int, Dict] = {}
+        payload = []
+        for index, operation in enumerate(operations):
+            op, tx_id, data = operation['op'], operation.get('id'), operation.get('data') or {}
+            try:
+                if op == 'create':
+                    data = TransactionCreate(**data).model_dump()
+                elif op == 'update':
+                    data = TransactionUpdate(**data).model_dump(exclude_unset=True)
+                if op != 'create' and not tx_id:
+                    raise ValueError("id is required")
+            except ValueError as e:
+                results[index] = {"index": index, "status": "error", "id": tx_id, "error": str(e)}
+                continue
+            payload.append(jsonable_encoder({"index": index, "op": op, "id": tx_id, "data": data}))
+
+        if atomic and results:
+            for i, operation in enumerate(operations):
+                results.setdefault(i, {"index": i, "status": "rolled_back", "id": operation.get('id')})
+            return {"committed": False, "results": [results[i] for i in range(len(operations))]}
+
+        committed = True
+        if payload:
+            res = await self.repository.apply_transaction_batch(family_id, str(user_id), payload, atomic)
+            committed = res.data['committed']
+            for item in res.data['results']:
+                results[item['index']] = item
+            if committed and any(item['status'] == 'ok' for item in res.data['results']):
+                notify_family_change(family_id, "transactions", "accounts")
+
+        return {"committed": committed, "results": [results[i] for i in range(len(operations))]}
+
+    async def import_transactions(self, user_id: str, family_id: Optional[str], rows: AsyncIterator[ImportRow], default_account_id: Optional[str] = None, dry_run: bool = False) -> Dict:
+        """
+        Validates parsed import rows with TransactionCreate and writes them in
+        batches. Each batch is stored together with its balance changes, so an
+        import that stops early leaves the rows already written consistent and
+        reports how far it got. With dry_run nothing is written.
+        """
+        if not family_id:
+            raise Exception("User does not belong to a family")
+
+        categories, accounts = await asyncio.gather(
+            reference_data.get_categories(family_id),
+            reference_data.get_accounts(family_id),
+        )
+        category_ids = {str(c['id']) for c in categories}
+        category_by_name = {c['name'].casefold(): str(c['id']) for c in categories}
+        account_ids = {str(a['id']) for a in accounts}
+        account_by_name = {a['name'].casefold(): str(a['id']) for a in accounts if a.get('name')}
+
+        result = {"dry_run": dry_run, "complete": True, "error": None, "total_rows": 0, "valid_rows": 0, "imported": 0,
+                  "duplicates": 0, "failed_rows": 0, "errors": [], "balance_deltas": {}}
+        deltas: List[Dict[str, float]] = []
+        batch: List[Tuple[int, Dict]] = []
+        seen_external_ids = set()
+
+        def report(row_no: int, error: str):
+            if len(result["errors"]) < settings.IMPORT_MAX_ERRORS:
+                result["errors"].append({"row": row_no, "error": error})
+
+        def fail(row_no: int, error: str):
+            result["failed_rows"] += 1
+            report(row_no, error)
+
+        async def flush():
+            txs = [tx for _, tx in batch]
+            # (account_id, external_id) -> row number, for statement rows
+            keyed = {(tx['account_id'], tx['external_id']): row_no for row_no, tx in batch if tx.get('external_id')}
+            if dry_run:
+                stored = set()
+                if keyed:
+                    res = await self.repository.get_stored_external_ids(
+                        sorted({account for account, _ in keyed}), sorted({external_id for _, external_id in keyed}))
+                    stored = {(str(r['account_id']), r['external_id']) for r in (res.data or [])}
+                deltas.extend(transaction_deltas(tx) for tx in txs if (tx['account_id'], tx.get('external_id')) not in stored)
+            else:
+                res = await self.repository.import_transaction_batch(family_id, str(user_id), txs)
+                outcome = res.data
+                result["imported"] += outcome["inserted"]
+                deltas.append(outcome["deltas"])
+                stored = {(str(d['account_id']), d['external_id']) for d in outcome["duplicates"]}
+            for key in stored & keyed.keys():
+                result["duplicates"] += 1
+                report(keyed[key], f"Already imported ({key[1]})")
+            batch.clear()
+
+        try:
+            async for row_no, raw in rows:
+                result["total_rows"] += 1
+                if result["total_rows"] > settings.IMPORT_MAX_ROWS:
+                    raise Exception(f"Import is limited to {settings.IMPORT_MAX_ROWS} rows")
+
+                external_id = raw.get("external_id")
+                if external_id:
+                    if external_id in seen_external_ids:
+                        fail(row_no, f"Duplicate entry {external_id}")
+                        continue
+                    seen_external_ids.add(external_id)
+
+                try:
+                    tx = self._import_payload(raw, default_account_id, category_by_name, account_by_name)
+                except ValidationError as e:
+                    fail(row_no, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+                    continue
+                except ValueError as e:
+                    fail(row_no, str(e))
+                    continue
+
+                if tx['account_id'] not in account_ids or (tx.get('target_account_id') and tx['target_account_id'] not in account_ids):
+                    fail(row_no, "Account does not belong to the family")
+                    continue
+                if tx.get('category_id') and tx['category_id'] not in category_ids:
+                    fail(row_no, "Unknown category")
+                    continue
+
+                result["valid_rows"] += 1
+                batch.append((row_no, {**tx, "external_id": external_id}))
+                if len(batch) >= settings.IMPORT_BATCH_SIZE:
+                    await flush()
+            if batch:
+                await flush()
+        except Exception as e:
+            if not result["imported"]:
+                raise
+            # Earlier batches are stored with their balance changes; say how far the import got
+            result["complete"] = False
+            result["error"] = str(e)
+        finally:
+            if not dry_run and result["imported"]:
+                notify_family_change(family_id, "transactions", "accounts")
+
+        result["balance_deltas"] = merge_deltas(*deltas)
+        return result
+
+    def _import_payload(self, raw: Dict, default_account_id: Optional[str], category_by_name: Dict[str, str], account_by_name: Dict[str, str]) -> Dict:
+        if not raw.get("amount"):
+            raise ValueError("Missing amount")
+        if not raw.get("date"):
+            raise ValueError("Missing date")
+        amount = parse_amount(raw["amount"])
+
+        tx_type = IMPORT_TYPES.get((raw.get("type") or "").strip().lower())
+        if raw.get("type") and not tx_type:
+            raise ValueError(f"Unknown type '{raw['type']}'")
+        if not tx_type:
+            # Bank statements sign the amount instead of naming the type
+            tx_type = "expense" if amount < 0 else "income"
+
+        account_id = raw.get("account_id")
+        if not account_id and raw.get("account_name"):
+            account_id = account_by_name.get(raw["account_name"].casefold())
+            if not account_id:
+                raise ValueError(f"Unknown account '{raw['account_name']}'")
+        category_id = raw.get("category_id")
+        if not category_id and raw.get("category_name"):
+            category_id = category_by_name.get(raw["category_name"].casefold())
+            if not category_id:
+                raise ValueError(f"Unknown category '{raw['category_name']}'")
+
+        tx = TransactionCreate(
+            description=raw.get("description") or "",
+            amount=float(abs(amount)),
+            type=tx_type,
+            date=parse_date(raw["date"]),
+            category_id=category_id,
+            account_id=account_id or default_account_id,
+            receipt_url=raw.get("receipt_url"),
+            target_account_id=raw.get("target_account_id"),
+        )
+        return jsonable_encoder(tx.model_dump())
+
+    def _rpc_row(self, res):
+        # Functions returning a single composite come back as an object, not a list
+        if isinstance(res.data, list):
+            return res.data[0] if res.data else None
+        return res.data
@@ -0,0 +1,85 @@
+"""
+PDF export benchmark: peak Python memory, wall time and worst event-loop
+stall while rendering synthetic histories.
+
+    python -m benchmarks.bench_pdf_export --rows 10000 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+from app.services.export_service import render_transactions_pdf
+
+def synthetic_row(i: int, start: datetime) -> dict:
+    return {
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "date": (start - timedelta(minutes=17 * i)).isoformat(),
+        "type": random.choice(["income", "expense", "expense", "transfer"]),
+        "description": f"Compra #{i} " + "x" * random.randint(5, 60),
+        "amount": round(random.uniform(1, 5000), 2),
+        "category_name": random.choice(["Comida", "Transporte", "Vivienda", None]),
+        "account_name": random.choice(["Cuenta Conjunta", "Ahorros"]),
+        "user_name": random.choice(["Ana", "Luis"]),
+        "receipt_url": "https://example.com/r.png" if i % 10 == 0 else None,
+    }
+
+async def pages(rows: int, page_size: int):
+    start = datetime(2026, 1, 1)
+    for offset in range(0, rows, page_size):
+        # Simulate the database round-trip for each page
+        await asyncio.sleep(0.005)
+        yield [synthetic_row(i, start) for i in range(offset, min(offset + page_size, rows))]
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        before = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - before - interval)
+    return worst
+
+async def run(rows: int, page_size: int) -> dict:
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    spool = await render_transactions_pdf(pages(rows, page_size))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stop.set()
+    worst_lag = await lag_task
+    spool.seek(0, os.SEEK_END)
+    size = spool.tell()
+    spool.close()
+
+    return {
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "peak_python_mb": round(peak / 1024 / 1024, 1),
+        "max_event_loop_stall_ms": round(worst_lag * 1000, 1),
+        "pdf_mb": round(size / 1024 / 1024, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    random.seed(42)
+    results = [asyncio.run(run(rows, args.page_size)) for rows in args.rows]
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
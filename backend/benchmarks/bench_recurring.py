@@ -0,0 +1,69 @@
+"""
+Recurring-expense detector benchmark over a synthetic family history.
+
+    python -m benchmarks.bench_recurring --rows 100000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import date, timedelta
+
+from app.services.recurring import RecurringDetector
+
+def synthetic_history(rows: int, start: date) -> list:
+    history = []
+    # A handful of genuine series: monthly subscriptions/rent and a weekly gym
+    for name, amount, step, count in [("NETFLIX.COM", 45000, 30.4, 24), ("Arriendo", 1500000, 30.4, 24), ("Gimnasio", 12000, 7, 100), ("Seguro auto", 900000, 365.25, 3)]:
+        for i in range(count):
+            history.append({
+                "amount": amount * random.uniform(0.98, 1.02),
+                "date": (start + timedelta(days=int(i * step) + random.randint(-1, 1))).isoformat(),
+                "description": f"{name} {i:03d}",
+                "category_id": "recurring",
+            })
+    while len(history) < rows:
+        history.append({
+            "amount": random.uniform(1000, 500000),
+            "date": (start + timedelta(days=random.randint(0, 730))).isoformat(),
+            "description": f"Compra comercio {random.choice('ABCDEFGHIJ')}{random.randint(0, 5000)}",
+            "category_id": random.choice(["comida", "transporte", "hogar", None]),
+        })
+    random.shuffle(history)
+    return history
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--new-rows", type=int, default=100)
+    args = parser.parse_args()
+
+    random.seed(42)
+    start = date(2024, 1, 1)
+    history = synthetic_history(args.rows, start)
+    incoming = synthetic_history(args.new_rows, start + timedelta(days=730))[:args.new_rows]
+
+    started = time.perf_counter()
+    detector = RecurringDetector().fit(history)
+    fit_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    found = detector.detect(start + timedelta(days=730))
+    detect_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    detector.update(incoming)
+    detector.detect(start + timedelta(days=731))
+    update_seconds = time.perf_counter() - started
+
+    print(json.dumps({
+        "rows": len(history),
+        "groups": len(detector),
+        "recurring_found": len(found),
+        "fit_ms": round(fit_seconds * 1000, 1),
+        "detect_ms": round(detect_seconds * 1000, 1),
+        f"update_{args.new_rows}_rows_and_detect_ms": round(update_seconds * 1000, 1),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Shared pieces of the API benchmarks: the local stack's address and keys,
+JWT minting, latency statistics and result files.
+"""
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+import jwt
+
+BENCH_URL = os.environ.get("BENCH_SUPABASE_URL", "http://localhost:54321")
+BENCH_JWT_SECRET = "niddoflow-benchmark-secret-not-for-production"
+RESULTS_DIR = Path(__file__).parent / "results"
+DATASET_PATH = RESULTS_DIR / "dataset.json"
+
+def mint_token(role: str, user_id: Optional[str] = None, email: Optional[str] = None, ttl: int = 24 * 3600) -> str:
+    now = int(time.time())
+    claims = {"role": role, "iat": now, "exp": now + ttl}
+    if user_id:
+        claims.update({"sub": user_id, "aud": "authenticated", "email": email})
+    return jwt.encode(claims, BENCH_JWT_SECRET, algorithm="HS256")
+
+def service_key() -> str:
+    return mint_token("service_role")
+
+def configure_app_env():
+    """Points Settings at the local stack. Must run before the app is imported."""
+    os.environ.update({
+        "SUPABASE_URL": BENCH_URL,
+        "SUPABASE_KEY": service_key(),
+        "SUPABASE_JWT_SECRET": BENCH_JWT_SECRET,
+        "AUTH_MODE": "local",
+        "AUTH_REMOTE_FALLBACK": "false",
+        "PROFILER_SAMPLE_RATE": "0",
+    })
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+def summarize(latencies: List[float], errors: int, wall_seconds: float) -> Dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        "throughput_rps": round(len(values) / wall_seconds, 2) if wall_seconds else 0.0,
+    }
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def write_results(name: str, payload: Dict) -> Path:
+    RESULTS_DIR.mkdir(exist_ok=True)
+    revision = git_revision() or "unknown"
+    path = RESULTS_DIR / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{revision}.json"
+    payload = {
+        "revision": revision,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        **payload,
+    }
+    path.write_text(json.dumps(payload, indent=2))
+    return path
+
+def compare(baseline: Dict, current: Dict, threshold_pct: float) -> List[str]:
+    """Scenarios whose p95 regressed by more than threshold_pct against the baseline."""
+    regressions = []
+    for scenario, stats in current.get("scenarios", {}).items():
+        before = baseline.get("scenarios", {}).get(scenario)
+        if not before or not before.get("p95_ms"):
+            continue
+        change = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        print(f"{scenario:28s} p95 {before['p95_ms']:9.2f} -> {stats['p95_ms']:9.2f} ms ({change:+.1f}%)")
+        if change > threshold_pct:
+            regressions.append(scenario)
+    return regressions
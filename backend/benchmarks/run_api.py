@@ -0,0 +1,179 @@
+"""
+End-to-end API benchmark against the local stack (see stack/docker-compose.yml).
+The app runs in-process behind httpx's ASGI transport, so timings cover
+routing, auth, services and the real PostgREST/Postgres round-trips.
+
+    python -m benchmarks.seed --families 20 --transactions 5000
+    python -m benchmarks.run_api --iterations 300 --concurrency 10
+    python -m benchmarks.run_api --compare benchmarks/results/api-<...>.json
+
+Results are written to benchmarks/results/ as JSON, tagged with the git
+revision, so runs of different commits can be compared.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List
+import httpx
+from benchmarks.harness import DATASET_PATH, compare, configure_app_env, mint_token, summarize, write_results
+
+configure_app_env()
+
+from main import app
+
+class Context:
+    """Picks a random member of a random seeded family per request."""
+    def __init__(self, dataset: dict):
+        self.families = dataset["families"]
+        self.tokens: Dict[str, str] = {}
+        # Ids of transactions created by the create scenario, consumed by update/delete
+        self.created: List[tuple] = []
+
+    def member(self):
+        family = random.choice(self.families)
+        user_id = random.choice(family["users"])
+        return family, user_id, self.headers_for(family, user_id)
+
+    def headers_for(self, family: dict, user_id: str) -> dict:
+        if user_id not in self.tokens:
+            self.tokens[user_id] = mint_token("authenticated", user_id, family["emails"][user_id])
+        return {"Authorization": f"Bearer {self.tokens[user_id]}"}
+
+def visible_account(family: dict, user_id: str) -> str:
+    return random.choice([a["id"] for a in family["accounts"] if a["user_id"] in (None, user_id)])
+
+async def dashboard(client: httpx.AsyncClient, ctx: Context):
+    _, _, headers = ctx.member()
+    return await client.get("/stats/dashboard", headers=headers)
+
+async def transactions_family(client: httpx.AsyncClient, ctx: Context):
+    _, _, headers = ctx.member()
+    return await client.get("/transactions/", params={"scope": "family", "limit": 50}, headers=headers)
+
+async def transactions_personal(client: httpx.AsyncClient, ctx: Context):
+    _, _, headers = ctx.member()
+    return await client.get("/transactions/", params={"scope": "personal", "limit": 50}, headers=headers)
+
+async def create_transaction(client: httpx.AsyncClient, ctx: Context):
+    family, user_id, headers = ctx.member()
+    res = await client.post("/transactions/", headers=headers, json={
+        "description": "Benchmark",
+        "amount": round(random.uniform(1_000, 100_000), 2),
+        "type": "expense",
+        "date": datetime.now(timezone.utc).isoformat(),
+        "category_id": random.choice(family["expense_categories"]),
+        "account_id": visible_account(family, user_id),
+    })
+    if res.status_code < 400:
+        ctx.created.append((family, user_id, res.json()["id"]))
+    return res
+
+async def update_transaction(client: httpx.AsyncClient, ctx: Context):
+    family, user_id, tx_id = random.choice(ctx.created)
+    return await client.patch(f"/transactions/{tx_id}", headers=ctx.headers_for(family, user_id),
+                              json={"amount": round(random.uniform(1_000, 100_000), 2), "description": "Benchmark (edited)"})
+
+async def delete_transaction(client: httpx.AsyncClient, ctx: Context):
+    family, user_id, tx_id = ctx.created.pop()
+    return await client.delete(f"/transactions/{tx_id}", headers=ctx.headers_for(family, user_id))
+
+async def debt_payment(client: httpx.AsyncClient, ctx: Context):
+    family, user_id, headers = ctx.member()
+    debt = random.choice(family["debts"])
+    return await client.post(f"/debts/{debt['id']}/pay", headers=headers, json={
+        "amount": 1_000, "accountId": visible_account(family, user_id), "type": debt["type"], "description": "Benchmark",
+    })
+
+async def pdf_export(client: httpx.AsyncClient, ctx: Context):
+    _, _, headers = ctx.member()
+    return await client.get("/transactions/export", params={"scope": "family"}, headers=headers)
+
+# Run in this order: update and delete work through what create left behind
+SCENARIOS: Dict[str, Callable[[httpx.AsyncClient, Context], Awaitable[httpx.Response]]] = {
+    "dashboard": dashboard,
+    "transactions_family": transactions_family,
+    "transactions_personal": transactions_personal,
+    "create_transaction": create_transaction,
+    "update_transaction": update_transaction,
+    "delete_transaction": delete_transaction,
+    "debt_payment": debt_payment,
+    "pdf_export": pdf_export,
+}
+
+async def run_scenario(client: httpx.AsyncClient, ctx: Context, scenario, iterations: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iterations
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started_at = time.perf_counter()
+            try:
+                res = await scenario(client, ctx)
+                await res.aread()
+                failed = res.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - started_at)
+            errors += failed
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started_at)
+
+async def main(args) -> int:
+    random.seed(args.seed)
+    dataset = json.loads(DATASET_PATH.read_text())
+    ctx = Context(dataset)
+    selected = args.scenarios or list(SCENARIOS)
+    results = {}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+            for name in selected:
+                iterations = args.export_iterations if name == "pdf_export" else args.iterations
+                if name in ("update_transaction", "delete_transaction") and not ctx.created:
+                    print(f"{name:28s} skipped (run create_transaction first)")
+                    continue
+                # Warm caches and connections so steady state is measured
+                await run_scenario(client, ctx, SCENARIOS[name], min(args.warmup, iterations), 1)
+                if name == "delete_transaction":
+                    iterations = min(iterations, len(ctx.created))
+                stats = await run_scenario(client, ctx, SCENARIOS[name], iterations, args.concurrency)
+                results[name] = stats
+                print(f"{name:28s} p50 {stats['p50_ms']:9.2f}  p95 {stats['p95_ms']:9.2f}  p99 {stats['p99_ms']:9.2f} ms  "
+                      f"{stats['throughput_rps']:8.1f} req/s  errors {stats['errors']}")
+
+    path = write_results("api", {
+        "params": {"iterations": args.iterations, "export_iterations": args.export_iterations, "concurrency": args.concurrency, "warmup": args.warmup},
+        "dataset": dataset["params"],
+        "scenarios": results,
+    })
+    print(f"results written to {path}")
+
+    if args.compare:
+        baseline = json.loads(open(args.compare).read())
+        regressions = compare(baseline, json.loads(path.read_text()), args.threshold)
+        if regressions:
+            print(f"p95 regressed by more than {args.threshold}%: {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS))
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--export-iterations", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--compare", help="results JSON of a previous run to compare p95 against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed p95 regression in percent")
+    parser.add_argument("--seed", type=int, default=7)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,141 @@
+"""
+Fills the local benchmark stack with synthetic families and writes the
+dataset manifest the API benchmark runs against.
+
+    python -m benchmarks.seed --families 20 --members 3 --transactions 5000
+
+Each family gets `members` users, one personal account per member plus
+joint accounts, its own categories on top of the defaults, monthly
+budgets, debts and `transactions` spread over the last 18 months.
+"""
+import argparse
+import asyncio
+import json
+import random
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+import httpx
+from benchmarks.harness import BENCH_URL, DATASET_PATH, RESULTS_DIR, service_key
+
+BATCH = 1000
+
+class Rest:
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+
+    async def insert(self, table: str, rows: list):
+        for i in range(0, len(rows), BATCH):
+            res = await self.client.post(f"/{table}", json=rows[i:i + BATCH], headers={"Prefer": "return=minimal"})
+            res.raise_for_status()
+
+    async def rpc(self, name: str, params: dict):
+        res = await self.client.post(f"/rpc/{name}", json=params)
+        res.raise_for_status()
+        return res.json()
+
+    async def select(self, table: str, params: dict):
+        res = await self.client.get(f"/{table}", params=params)
+        res.raise_for_status()
+        return res.json()
+
+def new_id() -> str:
+    return str(uuid.uuid4())
+
+async def seed_family(rest: Rest, index: int, args, default_categories: list) -> dict:
+    family_id = new_id()
+    await rest.insert("families", [{"id": family_id, "name": f"Familia {index:03d}", "invite_code": f"B{index:05d}"}])
+
+    users = [{"id": new_id(), "email": f"bench{index:03d}-{m}@example.com", "full_name": f"Miembro {index:03d}-{m}"} for m in range(args.members)]
+    await rest.rpc("bench_create_users", {"p_users": users})
+    for user in users:
+        res = await rest.client.patch("/profiles", params={"id": f"eq.{user['id']}"}, json={"family_id": family_id})
+        res.raise_for_status()
+
+    accounts = [{"id": new_id(), "name": f"Personal {u['full_name']}", "type": "personal", "family_id": family_id, "user_id": u["id"], "balance": 0} for u in users]
+    accounts += [{"id": new_id(), "name": f"Conjunta {j}", "type": "joint", "family_id": family_id, "user_id": None, "balance": 0} for j in range(max(1, args.accounts - len(users)))]
+    await rest.insert("accounts", accounts)
+
+    own_categories = [{"id": new_id(), "name": f"Categoria {index:03d}-{c}", "type": random.choice(["income", "expense"]), "is_default": False, "family_id": family_id} for c in range(args.categories)]
+    await rest.insert("categories", own_categories)
+    categories = default_categories + own_categories
+    expense_categories = [c["id"] for c in categories if c["type"] == "expense"]
+    income_categories = [c["id"] for c in categories if c["type"] == "income"]
+
+    today = datetime.now(timezone.utc)
+    budgets = []
+    for month_offset in range(args.budget_months):
+        month_date = (today.replace(day=1) - timedelta(days=31 * month_offset))
+        for category_id in random.sample(expense_categories, min(args.budgets, len(expense_categories))):
+            budgets.append({"id": new_id(), "family_id": family_id, "category_id": category_id, "amount": random.randint(100, 2000) * 1000,
+                            "period": "monthly", "month": month_date.month, "year": month_date.year})
+    await rest.insert("budgets", budgets)
+
+    debts = [{"id": new_id(), "family_id": family_id, "description": f"Deuda {d}", "type": random.choice(["to_pay", "to_receive"]),
+              "status": "active", "total_amount": 5_000_000, "remaining_amount": 5_000_000} for d in range(args.debts)]
+    await rest.insert("debts", debts)
+
+    transactions = []
+    deltas = defaultdict(float)
+    for _ in range(args.transactions):
+        roll = random.random()
+        account = random.choice(accounts)
+        tx_type = "expense" if roll < 0.7 else "income" if roll < 0.9 else "transfer"
+        amount = round(random.uniform(5_000, 800_000), 2)
+        tx = {
+            "id": new_id(),
+            "family_id": family_id,
+            "user_id": account["user_id"] or random.choice(users)["id"],
+            "account_id": account["id"],
+            "type": tx_type,
+            "amount": amount,
+            "description": f"Movimiento {random.randint(0, 5000)}",
+            "date": (today - timedelta(days=random.uniform(0, 540))).isoformat(),
+            "category_id": random.choice(expense_categories if tx_type == "expense" else income_categories) if tx_type != "transfer" else None,
+            "target_account_id": None,
+        }
+        if tx_type == "transfer":
+            tx["target_account_id"] = random.choice([a for a in accounts if a is not account])["id"]
+            deltas[tx["target_account_id"]] += amount
+        deltas[account["id"]] += amount if tx_type == "income" else -amount
+        transactions.append(tx)
+    await rest.insert("transactions", transactions)
+    await rest.rpc("apply_account_deltas", {"p_deltas": dict(deltas)})
+
+    return {
+        "family_id": family_id,
+        "users": [u["id"] for u in users],
+        "emails": {u["id"]: u["email"] for u in users},
+        "accounts": [{"id": a["id"], "type": a["type"], "user_id": a["user_id"]} for a in accounts],
+        "expense_categories": expense_categories,
+        "debts": [{"id": d["id"], "type": d["type"]} for d in debts],
+    }
+
+async def main(args):
+    random.seed(args.seed)
+    token = service_key()
+    headers = {"apikey": token, "Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=f"{BENCH_URL}/rest/v1", headers=headers, timeout=120) as client:
+        rest = Rest(client)
+        default_categories = await rest.select("categories", {"is_default": "eq.true", "select": "id,type"})
+        families = []
+        for index in range(args.families):
+            families.append(await seed_family(rest, index, args, default_categories))
+            print(f"seeded family {index + 1}/{args.families}")
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    DATASET_PATH.write_text(json.dumps({"params": vars(args), "families": families}, indent=2))
+    print(f"dataset manifest written to {DATASET_PATH}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--families", type=int, default=20)
+    parser.add_argument("--members", type=int, default=3)
+    parser.add_argument("--accounts", type=int, default=5, help="accounts per family (one personal per member, the rest joint)")
+    parser.add_argument("--categories", type=int, default=6, help="family categories on top of the defaults")
+    parser.add_argument("--budgets", type=int, default=5, help="budgets per month")
+    parser.add_argument("--budget-months", type=int, default=3)
+    parser.add_argument("--debts", type=int, default=4)
+    parser.add_argument("--transactions", type=int, default=5000, help="transactions per family")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(main(parser.parse_args()))
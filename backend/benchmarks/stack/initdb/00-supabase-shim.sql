@@ -0,0 +1,26 @@
+-- The parts of a Supabase database that schema.sql relies on: API roles,
+-- auth.users and the auth.uid()/auth.role() helpers.
+create role anon nologin;
+create role authenticated nologin;
+create role service_role nologin bypassrls;
+create role authenticator login password 'postgres' noinherit;
+grant anon, authenticated, service_role to authenticator;
+
+create schema auth;
+
+create table auth.users (
+  id uuid primary key,
+  email text,
+  raw_user_meta_data jsonb default '{}'::jsonb,
+  created_at timestamp with time zone default now()
+);
+
+create function auth.uid() returns uuid as $$
+  select nullif(current_setting('request.jwt.claims', true)::jsonb ->> 'sub', '')::uuid;
+$$ language sql stable;
+
+create function auth.role() returns text as $$
+  select current_setting('request.jwt.claims', true)::jsonb ->> 'role';
+$$ language sql stable;
+
+grant usage on schema auth to anon, authenticated, service_role;
@@ -0,0 +1,18 @@
+-- Grants Supabase applies by default, plus a seeding helper for auth.users
+-- (not reachable through PostgREST otherwise).
+grant usage on schema public to anon, authenticated, service_role;
+grant all on all tables in schema public to authenticated, service_role;
+grant all on all sequences in schema public to authenticated, service_role;
+grant execute on all functions in schema public to anon, authenticated, service_role;
+
+create or replace function public.bench_create_users(p_users jsonb)
+returns integer as $$
+  insert into auth.users (id, email, raw_user_meta_data)
+  select (u ->> 'id')::uuid, u ->> 'email', jsonb_build_object('full_name', u ->> 'full_name')
+    from jsonb_array_elements(p_users) u;
+  select jsonb_array_length(p_users);
+$$ language sql security definer;
+
+grant execute on function public.bench_create_users(jsonb) to service_role;
+
+notify pgrst, 'reload schema';
@@ -1,8 +1,9 @@
+import hmac
 import time
 import logging
-from pyinstrument import Profiler
-from fastapi.responses import HTMLResponse
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi.responses import HTMLResponse, PlainTextResponse
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 # Setup logging
@@ -18,27 +19,91 @@ from app.routers import category as category_router
 from app.routers import budget as budget_router
 from app.routers import debt as debt_router
 from app.routers import stats as stats_router
+from app.routers import insights as insights_router
+from app.routers import sync as sync_router
+from app.routers import admin as admin_router
+from app.db.supabase import init_supabase, close_supabase
+from app.core.config import settings
+from app.core.tracing import start_trace, end_trace, current_trace
+from app.core.metrics import REQUEST_LATENCY, REQUESTS_IN_FLIGHT, render_metrics
+from app.core.profiling import request_profiler, start_profiler
+from app.dependencies import is_admin_request
 
-app = FastAPI(title="NiddoFlow API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_supabase()
+    yield
+    await close_supabase()
+
+app = FastAPI(title="NiddoFlow API", lifespan=lifespan)
+
+_route_templates = {}
+
+def _route_template(request: Request) -> str:
+    """Path template of the matched route (bounded label values); 'unmatched' otherwise."""
+    endpoint = request.scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    template = _route_templates.get(endpoint)
+    if template is None:
+        template = next((r.path for r in app.routes if getattr(r, "endpoint", None) is endpoint), "unmatched")
+        _route_templates[endpoint] = template
+    return template
 
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
-    should_profile = request.query_params.get("profile", "false").lower() == "true"
-    
+    # ?profile=true is ignored unless enabled in settings and requested by an admin
+    should_profile = (
+        settings.PROFILE_QUERY_ENABLED
+        and request.query_params.get("profile", "false").lower() == "true"
+        and await is_admin_request(request)
+    )
+    profiler = None
     if should_profile:
-        profiler = Profiler(interval=0.001)
-        profiler.start()
+        profiler = start_profiler(0.001)
+    elif request_profiler.should_sample():
+        profiler = request_profiler.start()
         
+    trace_token = start_trace() if settings.DB_TRACE_ENABLED else None
+    REQUESTS_IN_FLIGHT.inc()
     start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
+    try:
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        trace = current_trace()
+    except BaseException:
+        if profiler is not None:
+            profiler.stop()
+        raise
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        if trace_token is not None:
+            end_trace(trace_token)
+    REQUEST_LATENCY.labels(request.method, _route_template(request), str(response.status_code)).observe(process_time)
     
     if should_profile:
         profiler.stop()
         return HTMLResponse(content=profiler.output_html())
+    if profiler is not None:
+        request_profiler.record(_route_template(request), profiler, process_time * 1000)
         
-    # Log the time taken for each request
-    logger.info(f"Path: {request.url.path} | Time: {process_time:.4f}s")
+    # Log the time taken for each request, with the database calls it made
+    if trace is None:
+        logger.info(f"Path: {request.url.path} | Time: {process_time:.4f}s")
+    else:
+        fields = trace.log_fields()
+        logger.info(
+            f"Path: {request.url.path} | Time: {process_time:.4f}s | DB: {fields['db_calls']} calls {fields['db_ms']}ms",
+            extra={"path": request.url.path, "duration_ms": round(process_time * 1000, 1), **fields},
+        )
+        # Paged walks (exports, history reads) are exempt: their call count follows the data size
+        unpaged = len(trace.unpaged_calls())
+        if unpaged > settings.DB_TRACE_MAX_CALLS:
+            logger.warning(f"Path: {request.url.path} issued {unpaged} database calls (limit {settings.DB_TRACE_MAX_CALLS})")
+        for shape, count in trace.repeated_shapes(settings.DB_TRACE_REPEAT_THRESHOLD).items():
+            sources = sorted({c.source for c in trace.calls if c.shape == shape and c.source})
+            logger.warning(f"Path: {request.url.path} repeated '{shape}' {count} times (N+1?) from {', '.join(sources) or 'unknown'}")
+        response.headers["Server-Timing"] = trace.server_timing(process_time * 1000)
     response.headers["X-Process-Time"] = str(process_time)
     return response
 
@@ -56,6 +121,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
 )
 
 app.include_router(family_router.router)
@@ -65,12 +131,24 @@ app.include_router(category_router.router)
 app.include_router(budget_router.router)
 app.include_router(debt_router.router)
 app.include_router(stats_router.router)
+app.include_router(insights_router.router)
+app.include_router(sync_router.router)
+app.include_router(admin_router.router)
 
 
 @app.get("/")
 def read_root():
     return {"message": "NiddoFlow Backend is running!"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    # The /api proxy makes this reachable from outside, so it is never served without a token
+    if not settings.METRICS_ENABLED or not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404)
+    if not hmac.compare_digest(request.headers.get("authorization", ""), f"Bearer {settings.METRICS_TOKEN}"):
+        raise HTTPException(status_code=401)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
@@ -0,0 +1,82 @@
+"""
+Cold-start budget: imports the app with `python -X importtime` in a fresh
+interpreter and fails when the import takes longer than the budget, or when
+a module that must only load on first use is imported at startup.
+
+The default budget is ~40% above the measured baseline: `import main` took
+805-866 ms (best of 5, Python 3.11, single core), most of it fastapi/pydantic
+(~500 ms) and jwt/cryptography + httpx for auth (~110 ms). Re-measure and
+adjust it when the dependency set changes.
+
+    python -m scripts.check_import_time
+    python -m scripts.check_import_time --budget-ms 1000 --runs 5 --top 15
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Loaded on first PDF export, insights request, profiled request, or in the
+# lifespan (supabase/postgrest); none of them may be pulled in by `import main`
+LAZY_MODULES = ("reportlab", "numpy", "pyinstrument", "supabase", "postgrest", "gotrue", "realtime", "storage3")
+
+# "import time:       self [us] |       cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+def measure(module: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self us, cumulative us, nesting depth) for every import, in import order."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    # Settings require these; the app does not connect anywhere at import time
+    env.setdefault("SUPABASE_URL", "http://localhost:54321")
+    env.setdefault("SUPABASE_KEY", "import-time-check")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(f"`import {module}` failed:\n{proc.stderr[-2000:]}")
+    imports = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return imports
+
+def main(args) -> int:
+    runs = [measure(args.module) for _ in range(args.runs)]
+    totals = [sum(self_us for _, self_us, _, _ in imports) for imports in runs]
+    # The fastest run is the least disturbed by whatever else the machine is doing
+    best = runs[totals.index(min(totals))]
+    total_ms = min(totals) / 1000
+
+    top_level: Dict[str, int] = {}
+    for name, _, cumulative_us, depth in best:
+        if depth == 0:
+            top_level[name] = top_level.get(name, 0) + cumulative_us
+    print(f"import {args.module}: {total_ms:.1f} ms (best of {args.runs}; budget {args.budget_ms:.0f} ms)")
+    for name, cumulative_us in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    eager = sorted({name for name, _, _, _ in best if name.split(".", 1)[0] in LAZY_MODULES})
+    if eager:
+        print(f"FAIL: imported at startup but meant to load lazily: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import time {total_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=float(os.environ.get("IMPORT_TIME_BUDGET_MS", 1200)))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level imports to list")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,20 @@
+"""
+Drops delta-sync change log entries older than SYNC_RETENTION_DAYS.
+
+    python -m scripts.prune_changes
+"""
+import asyncio
+from app.core.config import settings
+from app.db.supabase import init_supabase, close_supabase
+from app.repositories.sync_repository import SyncRepository
+
+async def main():
+    await init_supabase()
+    try:
+        res = await SyncRepository().prune_changes(settings.SYNC_RETENTION_DAYS)
+        print(f"Pruned {res.data} change log entries")
+    finally:
+        await close_supabase()
+
+if __name__ == "__main__":
+    asyncio.run(main())
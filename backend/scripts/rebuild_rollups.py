@@ -0,0 +1,21 @@
+"""
+Rebuilds transaction_rollups_daily from the raw transactions table.
+
+    python -m scripts.rebuild_rollups               # every family
+    python -m scripts.rebuild_rollups <family_id>   # a single family
+"""
+import asyncio
+import sys
+from app.db.supabase import init_supabase, close_supabase
+from app.repositories.stats_repository import StatsRepository
+
+async def main(family_id: str = None):
+    await init_supabase()
+    try:
+        res = await StatsRepository().rebuild_rollups(family_id)
+        print(f"Rebuilt {res.data} rollup rows")
+    finally:
+        await close_supabase()
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else None))
@@ -131,3 +131,759 @@ alter table debts enable row level security;
 
 create policy "Allow all for authenticated" on budgets for all using (auth.role() = 'authenticated');
 create policy "Allow all for authenticated" on debts for all using (auth.role() = 'authenticated');
+
+-- Atomic balance updates.
+-- p_deltas is a json object of {account_id: delta}; every account is
+-- incremented in a single statement so concurrent writers never lose updates.
+create or replace function public.apply_account_deltas(p_deltas jsonb)
+returns void as $$
+  update accounts a
+     set balance = a.balance + d.value::numeric
+    from jsonb_each_text(p_deltas) d
+   where a.id = d.key::uuid;
+$$ language sql;
+
+-- Columns used by transfers and receipts
+alter table transactions add column if not exists target_account_id uuid references accounts(id) on delete set null;
+alter table transactions add column if not exists receipt_url text;
+-- Account a debt's principal was paid into or out of
+alter table debts add column if not exists account_id uuid references accounts(id) on delete set null;
+
+-- Sums two {account_id: delta} objects, dropping accounts that net to zero
+create or replace function public.merge_account_deltas(a jsonb, b jsonb)
+returns jsonb as $$
+  select coalesce(jsonb_object_agg(key, total), '{}'::jsonb)
+    from (
+      select key, sum(value::numeric) as total
+        from (
+          select * from jsonb_each_text(coalesce(a, '{}'::jsonb))
+          union all
+          select * from jsonb_each_text(coalesce(b, '{}'::jsonb))
+        ) s
+       group by key
+    ) t
+   where total <> 0;
+$$ language sql immutable;
+
+-- Balance impact of one transaction; p_sign = -1 reverses it
+create or replace function public.transaction_deltas(p_tx transactions, p_sign numeric default 1)
+returns jsonb as $$
+  select public.merge_account_deltas(
+    jsonb_build_object(
+      p_tx.account_id::text,
+      (case when p_tx.type in ('expense', 'transfer') then -p_tx.amount else p_tx.amount end) * p_sign
+    ),
+    case when p_tx.type = 'transfer' and p_tx.target_account_id is not null
+      then jsonb_build_object(p_tx.target_account_id::text, p_tx.amount * p_sign)
+      else '{}'::jsonb
+    end
+  );
+$$ language sql immutable;
+
+-- Both accounts of a transaction must belong to the caller's family
+create or replace function public.assert_transaction_accounts(p_tx transactions, p_family_id uuid)
+returns void as $$
+begin
+  if not exists (select 1 from accounts where id = p_tx.account_id and family_id = p_family_id)
+     or (p_tx.target_account_id is not null
+         and not exists (select 1 from accounts where id = p_tx.target_account_id and family_id = p_family_id)) then
+    raise exception 'Not authorized';
+  end if;
+end;
+$$ language plpgsql;
+
+-- Transaction writes: row change and balance adjustments in one database transaction
+create or replace function public.create_transaction_atomic(p_family_id uuid, p_user_id uuid, p_data jsonb)
+returns transactions as $$
+declare
+  v_tx transactions;
+begin
+  if p_family_id is null then
+    raise exception 'User does not belong to a family';
+  end if;
+
+  v_tx := jsonb_populate_record(null::transactions, p_data);
+  perform public.assert_transaction_accounts(v_tx, p_family_id);
+
+  insert into transactions (description, amount, type, date, category_id, account_id, target_account_id, receipt_url, user_id, family_id)
+  values (v_tx.description, v_tx.amount, v_tx.type, coalesce(v_tx.date, now()), v_tx.category_id, v_tx.account_id,
+          v_tx.target_account_id, v_tx.receipt_url, p_user_id, p_family_id)
+  returning * into v_tx;
+
+  perform public.apply_account_deltas(public.transaction_deltas(v_tx));
+  return v_tx;
+end;
+$$ language plpgsql;
+
+create or replace function public.update_transaction_atomic(p_family_id uuid, p_tx_id uuid, p_updates jsonb)
+returns transactions as $$
+declare
+  v_old transactions;
+  v_new transactions;
+begin
+  select * into v_old from transactions where id = p_tx_id for update;
+  if not found then
+    raise exception 'Transaction not found';
+  end if;
+  if v_old.family_id is distinct from p_family_id then
+    raise exception 'Not authorized';
+  end if;
+
+  v_new := jsonb_populate_record(v_old, p_updates);
+  perform public.assert_transaction_accounts(v_new, p_family_id);
+
+  update transactions
+     set description = v_new.description,
+         amount = v_new.amount,
+         type = v_new.type,
+         date = v_new.date,
+         category_id = v_new.category_id,
+         account_id = v_new.account_id,
+         target_account_id = v_new.target_account_id,
+         receipt_url = v_new.receipt_url
+   where id = p_tx_id
+  returning * into v_new;
+
+  perform public.apply_account_deltas(
+    public.merge_account_deltas(public.transaction_deltas(v_old, -1), public.transaction_deltas(v_new))
+  );
+  return v_new;
+end;
+$$ language plpgsql;
+
+create or replace function public.delete_transaction_atomic(p_family_id uuid, p_tx_id uuid)
+returns boolean as $$
+declare
+  v_tx transactions;
+begin
+  select * into v_tx from transactions where id = p_tx_id for update;
+  if not found then
+    raise exception 'Transaction not found';
+  end if;
+  if v_tx.family_id is distinct from p_family_id then
+    raise exception 'Not authorized';
+  end if;
+
+  delete from transactions where id = p_tx_id;
+  perform public.apply_account_deltas(public.transaction_deltas(v_tx, -1));
+  return true;
+end;
+$$ language plpgsql;
+
+-- Debt writes: the debt row, its transaction and the balance adjustment in one
+-- database transaction. p_tx (optional on create) is a create_transaction_atomic payload.
+create or replace function public.create_debt_atomic(p_family_id uuid, p_user_id uuid, p_debt jsonb, p_tx jsonb default null)
+returns debts as $$
+declare
+  v_debt debts;
+begin
+  if p_family_id is null then
+    raise exception 'User not in a family';
+  end if;
+
+  v_debt := jsonb_populate_record(null::debts, p_debt);
+  insert into debts (description, total_amount, remaining_amount, type, status, category_id, account_id, due_date, family_id)
+  values (v_debt.description, v_debt.total_amount, v_debt.remaining_amount, v_debt.type, coalesce(v_debt.status, 'active'),
+          v_debt.category_id, v_debt.account_id, v_debt.due_date, p_family_id)
+  returning * into v_debt;
+
+  if p_tx is not null then
+    perform public.create_transaction_atomic(p_family_id, p_user_id, p_tx);
+  end if;
+  return v_debt;
+end;
+$$ language plpgsql;
+
+-- The remaining amount is decremented in place, so concurrent payments never lose one
+create or replace function public.pay_debt_atomic(p_family_id uuid, p_user_id uuid, p_debt_id uuid, p_tx jsonb)
+returns debts as $$
+declare
+  v_debt debts;
+  v_amount numeric := (p_tx->>'amount')::numeric;
+begin
+  select * into v_debt from debts where id = p_debt_id for update;
+  if not found or v_debt.family_id is distinct from p_family_id then
+    raise exception 'Debt not found';
+  end if;
+
+  perform public.create_transaction_atomic(p_family_id, p_user_id, p_tx);
+
+  update debts
+     set remaining_amount = greatest(0, remaining_amount - v_amount),
+         status = case when remaining_amount - v_amount <= 0 then 'paid' else 'active' end
+   where id = p_debt_id
+  returning * into v_debt;
+  return v_debt;
+end;
+$$ language plpgsql;
+
+-- Rollups: per family/account/category/day sums, maintained on every
+-- transaction write so stats read O(days) rows instead of O(transactions).
+create table if not exists transaction_rollups_daily (
+  family_id uuid references families(id) on delete cascade not null,
+  account_id uuid references accounts(id) on delete cascade not null,
+  category_id uuid references categories(id) on delete cascade,
+  day date not null,
+  income numeric not null default 0,
+  expense numeric not null default 0,
+  transfer numeric not null default 0,
+  tx_count integer not null default 0,
+  constraint transaction_rollups_daily_key unique nulls not distinct (family_id, account_id, category_id, day)
+);
+
+create index if not exists transaction_rollups_daily_family_day_idx on transaction_rollups_daily (family_id, day);
+
+alter table transaction_rollups_daily enable row level security;
+create policy "Allow all for authenticated" on transaction_rollups_daily for all using (auth.role() = 'authenticated');
+
+create or replace view transaction_rollups_monthly as
+  select family_id, account_id, category_id,
+         date_trunc('month', day)::date as month,
+         sum(income) as income, sum(expense) as expense, sum(transfer) as transfer,
+         sum(tx_count)::integer as tx_count
+    from transaction_rollups_daily
+   group by family_id, account_id, category_id, date_trunc('month', day);
+
+create or replace function public.rollup_apply(p_tx transactions, p_sign integer)
+returns void as $$
+  insert into transaction_rollups_daily as r (family_id, account_id, category_id, day, income, expense, transfer, tx_count)
+  values (
+    p_tx.family_id, p_tx.account_id, p_tx.category_id, (p_tx.date at time zone 'utc')::date,
+    case when p_tx.type = 'income' then p_tx.amount * p_sign else 0 end,
+    case when p_tx.type = 'expense' then p_tx.amount * p_sign else 0 end,
+    case when p_tx.type = 'transfer' then p_tx.amount * p_sign else 0 end,
+    p_sign
+  )
+  on conflict on constraint transaction_rollups_daily_key do update
+     set income = r.income + excluded.income,
+         expense = r.expense + excluded.expense,
+         transfer = r.transfer + excluded.transfer,
+         tx_count = r.tx_count + excluded.tx_count;
+$$ language sql;
+
+create or replace function public.rollup_transaction_change()
+returns trigger as $$
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    perform public.rollup_apply(old, -1);
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') then
+    perform public.rollup_apply(new, 1);
+  end if;
+  return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists transactions_rollup on transactions;
+create trigger transactions_rollup
+  after insert or update or delete on transactions
+  for each row execute procedure public.rollup_transaction_change();
+
+-- Backfill / repair. Pass null to rebuild every family.
+create or replace function public.rebuild_transaction_rollups(p_family_id uuid default null)
+returns integer as $$
+declare
+  v_rows integer;
+begin
+  delete from transaction_rollups_daily where p_family_id is null or family_id = p_family_id;
+
+  insert into transaction_rollups_daily (family_id, account_id, category_id, day, income, expense, transfer, tx_count)
+  select family_id, account_id, category_id, (date at time zone 'utc')::date,
+         sum(case when type = 'income' then amount else 0 end),
+         sum(case when type = 'expense' then amount else 0 end),
+         sum(case when type = 'transfer' then amount else 0 end),
+         count(*)
+    from transactions
+   where p_family_id is null or family_id = p_family_id
+   group by family_id, account_id, category_id, (date at time zone 'utc')::date;
+
+  get diagnostics v_rows = row_count;
+  return v_rows;
+end;
+$$ language plpgsql;
+
+-- Dashboard summary over the accounts the user can see (joint + own personal):
+-- total balance, current month income/expense and six months of monthly trends.
+create or replace function public.get_dashboard_summary(p_user_id uuid)
+returns json as $$
+declare
+  v_family_id uuid;
+  v_month date := date_trunc('month', timezone('utc', now()))::date;
+  v_result json;
+begin
+  select family_id into v_family_id from profiles where id = p_user_id;
+  if v_family_id is null then
+    return null;
+  end if;
+
+  with visible_accounts as (
+    select id, balance from accounts
+     where family_id = v_family_id and (user_id is null or user_id = p_user_id)
+  ),
+  months as (
+    select r.month, sum(r.income) as income, sum(r.expense) as expense
+      from transaction_rollups_monthly r
+      join visible_accounts a on a.id = r.account_id
+     where r.family_id = v_family_id and r.month >= (v_month - interval '5 months')
+     group by r.month
+  )
+  select json_build_object(
+    'total_balance', coalesce((select sum(balance) from visible_accounts), 0),
+    'monthly_income', coalesce((select income from months where month = v_month), 0),
+    'monthly_expense', coalesce((select expense from months where month = v_month), 0),
+    'trends', coalesce((
+      select json_agg(json_build_object('date', to_char(month, 'YYYY-MM'), 'income', income, 'expense', expense) order by month)
+        from months
+    ), '[]'::json)
+  ) into v_result;
+
+  return v_result;
+end;
+$$ language plpgsql stable;
+
+-- Budgets may belong to a single member
+alter table budgets add column if not exists user_id uuid references auth.users(id) on delete cascade;
+
+-- Spent vs limit for every budget of a family in one grouped query.
+-- Periods: explicit start/end dates when set, else the ISO week (weekly)
+-- or calendar month (monthly). Only accounts visible to the caller count
+-- (joint + own personal). Family budgets read the daily rollups; personal
+-- budgets only count their owner's transactions, so they read transactions.
+-- p_scope: 'family' (shared budgets), 'personal' (the caller's) or 'all'.
+create or replace function public.get_budget_progress(p_family_id uuid, p_user_id uuid, p_scope text default 'family')
+returns table (
+  id uuid, category_id uuid, family_id uuid, user_id uuid, amount numeric, period text,
+  month integer, week_number integer, year integer, start_date date, end_date date,
+  created_at timestamp with time zone, period_start date, period_end date,
+  spent numeric, remaining numeric, percentage numeric
+) as $$
+  with visible_accounts as (
+    select a.id from accounts a
+     where a.family_id = p_family_id and (a.user_id is null or a.user_id = p_user_id)
+  ),
+  scoped as (
+    select b.*,
+           coalesce(b.start_date,
+             case when b.period = 'weekly'
+               then to_date(b.year::text || lpad(coalesce(b.week_number, 1)::text, 2, '0'), 'IYYYIW')
+               else make_date(b.year, coalesce(b.month, 1), 1)
+             end) as p_start,
+           coalesce(b.end_date,
+             case when b.period = 'weekly'
+               then to_date(b.year::text || lpad(coalesce(b.week_number, 1)::text, 2, '0'), 'IYYYIW') + 6
+               else (make_date(b.year, coalesce(b.month, 1), 1) + interval '1 month' - interval '1 day')::date
+             end) as p_end
+      from budgets b
+     where b.family_id = p_family_id
+       and (p_scope = 'all' and (b.user_id is null or b.user_id = p_user_id)
+            or p_scope = 'personal' and b.user_id = p_user_id
+            or p_scope = 'family' and b.user_id is null)
+  ),
+  family_spent as (
+    select s.id, sum(r.expense) as spent
+      from scoped s
+      join transaction_rollups_daily r
+        on r.family_id = s.family_id and r.category_id = s.category_id
+       and r.day between s.p_start and s.p_end
+       and r.account_id in (select va.id from visible_accounts va)
+     where s.user_id is null
+     group by s.id
+  ),
+  personal_spent as (
+    select s.id, sum(t.amount) as spent
+      from scoped s
+      join transactions t
+        on t.family_id = s.family_id and t.type = 'expense' and t.category_id = s.category_id
+       and t.user_id = s.user_id
+       and (t.date at time zone 'utc')::date between s.p_start and s.p_end
+       and t.account_id in (select va.id from visible_accounts va)
+     where s.user_id is not null
+     group by s.id
+  )
+  select s.id, s.category_id, s.family_id, s.user_id, s.amount, s.period,
+         s.month, s.week_number, s.year, s.start_date, s.end_date, s.created_at,
+         s.p_start, s.p_end,
+         coalesce(f.spent, p.spent, 0) as spent,
+         s.amount - coalesce(f.spent, p.spent, 0) as remaining,
+         case when s.amount > 0 then round(coalesce(f.spent, p.spent, 0) / s.amount * 100, 2) else 0 end as percentage
+    from scoped s
+    left join family_spent f on f.id = s.id
+    left join personal_spent p on p.id = s.id
+   order by s.year desc, s.month desc nulls last, s.week_number desc nulls last;
+$$ language sql stable;
+
+-- Batch of transaction writes in one database transaction. p_ops is an
+-- ordered array of {index, op: create|update|delete, id, data}; each op runs
+-- in its own savepoint so a failure is reported without undoing the others,
+-- unless p_atomic, in which case any failure rolls the whole batch back.
+-- Balance deltas of all applied ops are coalesced and applied once.
+create or replace function public.apply_transaction_batch(p_family_id uuid, p_user_id uuid, p_ops jsonb, p_atomic boolean default false)
+returns jsonb as $$
+declare
+  v_op jsonb;
+  v_old transactions;
+  v_tx transactions;
+  v_deltas jsonb := '{}'::jsonb;
+  v_results jsonb := '[]'::jsonb;
+  v_failed boolean := false;
+  v_committed boolean := true;
+begin
+  if p_family_id is null then
+    raise exception 'User does not belong to a family';
+  end if;
+
+  begin
+    for v_op in select value from jsonb_array_elements(p_ops) loop
+      begin
+        if v_op->>'op' = 'create' then
+          v_tx := jsonb_populate_record(null::transactions, v_op->'data');
+          perform public.assert_transaction_accounts(v_tx, p_family_id);
+          insert into transactions (id, description, amount, type, date, category_id, account_id, target_account_id, receipt_url, user_id, family_id)
+          values (coalesce((v_op->>'id')::uuid, gen_random_uuid()), v_tx.description, v_tx.amount, v_tx.type, coalesce(v_tx.date, now()),
+                  v_tx.category_id, v_tx.account_id, v_tx.target_account_id, v_tx.receipt_url, p_user_id, p_family_id)
+          returning * into v_tx;
+          v_deltas := public.merge_account_deltas(v_deltas, public.transaction_deltas(v_tx));
+        else
+          select * into v_old from transactions where id = (v_op->>'id')::uuid for update;
+          if not found then
+            raise exception 'Transaction not found';
+          end if;
+          if v_old.family_id is distinct from p_family_id then
+            raise exception 'Not authorized';
+          end if;
+
+          if v_op->>'op' = 'update' then
+            v_tx := jsonb_populate_record(v_old, v_op->'data');
+            perform public.assert_transaction_accounts(v_tx, p_family_id);
+            update transactions
+               set description = v_tx.description,
+                   amount = v_tx.amount,
+                   type = v_tx.type,
+                   date = v_tx.date,
+                   category_id = v_tx.category_id,
+                   account_id = v_tx.account_id,
+                   target_account_id = v_tx.target_account_id,
+                   receipt_url = v_tx.receipt_url
+             where id = v_old.id
+            returning * into v_tx;
+            v_deltas := public.merge_account_deltas(v_deltas,
+              public.merge_account_deltas(public.transaction_deltas(v_old, -1), public.transaction_deltas(v_tx)));
+          elsif v_op->>'op' = 'delete' then
+            delete from transactions where id = v_old.id;
+            v_tx := null;
+            v_deltas := public.merge_account_deltas(v_deltas, public.transaction_deltas(v_old, -1));
+          else
+            raise exception 'Unknown operation %', v_op->>'op';
+          end if;
+        end if;
+
+        v_results := v_results || jsonb_build_object(
+          'index', (v_op->>'index')::integer, 'status', 'ok',
+          'id', coalesce(v_tx.id, v_old.id), 'data', case when v_tx.id is null then null else to_jsonb(v_tx) end);
+      exception when others then
+        v_failed := true;
+        v_results := v_results || jsonb_build_object(
+          'index', (v_op->>'index')::integer, 'status', 'error', 'id', v_op->>'id', 'error', sqlerrm);
+      end;
+      v_old := null;
+    end loop;
+
+    if p_atomic and v_failed then
+      raise exception using errcode = 'NFB01', message = 'Batch rolled back';
+    end if;
+    perform public.apply_account_deltas(v_deltas);
+  exception when sqlstate 'NFB01' then
+    -- Every applied op was undone with the block; plpgsql variables were not
+    v_committed := false;
+    select coalesce(jsonb_agg(case when r->>'status' = 'ok'
+                                   then r || jsonb_build_object('status', 'rolled_back', 'data', null)
+                                   else r end), '[]'::jsonb)
+      into v_results
+      from jsonb_array_elements(v_results) r;
+  end;
+
+  return jsonb_build_object('committed', v_committed, 'results', v_results);
+end;
+$$ language plpgsql;
+
+-- Change log for delta sync. Every insert/update/delete on the synced
+-- tables appends (entity, row_id, op); deletes are kept as tombstones until
+-- pruned. Ids are assigned at insert but only become visible at commit, so a
+-- long transaction can commit ids below ones a client has already read; the
+-- cursor is therefore the writing transaction's id (txid), see get_family_changes.
+create table if not exists family_changes (
+  id bigint generated always as identity primary key,
+  family_id uuid not null,
+  entity text not null,
+  row_id uuid not null,
+  op text not null check (op in ('upsert', 'delete')),
+  changed_at timestamp with time zone default timezone('utc'::text, now()) not null
+);
+
+alter table family_changes add column if not exists txid bigint not null default (pg_current_xact_id()::text::bigint);
+
+create index if not exists family_changes_family_id_idx on family_changes (family_id, id);
+create index if not exists family_changes_family_txid_idx on family_changes (family_id, txid, id);
+create index if not exists family_changes_changed_at_idx on family_changes (changed_at);
+
+alter table family_changes enable row level security;
+
+create or replace function public.record_family_change()
+returns trigger as $$
+begin
+  if tg_op = 'DELETE' then
+    insert into family_changes (family_id, entity, row_id, op) values (old.family_id, tg_table_name, old.id, 'delete');
+    return old;
+  end if;
+  if tg_op = 'UPDATE' and old.family_id is distinct from new.family_id and old.family_id is not null then
+    insert into family_changes (family_id, entity, row_id, op) values (old.family_id, tg_table_name, old.id, 'delete');
+  end if;
+  if new.family_id is not null then
+    insert into family_changes (family_id, entity, row_id, op) values (new.family_id, tg_table_name, new.id, 'upsert');
+  end if;
+  return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists transactions_change_log on transactions;
+create trigger transactions_change_log after insert or update or delete on transactions
+  for each row execute function public.record_family_change();
+drop trigger if exists accounts_change_log on accounts;
+create trigger accounts_change_log after insert or update or delete on accounts
+  for each row execute function public.record_family_change();
+drop trigger if exists budgets_change_log on budgets;
+create trigger budgets_change_log after insert or update or delete on budgets
+  for each row execute function public.record_family_change();
+drop trigger if exists debts_change_log on debts;
+create trigger debts_change_log after insert or update or delete on debts
+  for each row execute function public.record_family_change();
+
+-- Changes of a family after the cursor (p_after_txid, p_after_id), exclusive,
+-- at most p_limit log entries in (txid, id) order. Only entries written by
+-- transactions older than the snapshot's xmin are returned: every such
+-- transaction has finished, so nothing can still appear below the cursor.
+-- Entries of in-flight transactions are picked up by a later call.
+-- Several entries for the same row collapse into its latest state: the
+-- current row for upserts, a tombstone for deletes (or rows gone since).
+-- With p_after_txid null only the current head is returned.
+drop function if exists public.get_family_changes(uuid, bigint, integer);
+create or replace function public.get_family_changes(p_family_id uuid, p_after_txid bigint, p_after_id bigint, p_limit integer default 1000)
+returns json as $$
+  with horizon as (
+    select pg_snapshot_xmin(pg_current_snapshot())::text::bigint as xmin
+  ),
+  log_window as (
+    select c.* from family_changes c, horizon h
+     where p_after_txid is not null and c.family_id = p_family_id
+       and (c.txid, c.id) > (p_after_txid, coalesce(p_after_id, 0))
+       and c.txid < h.xmin
+     order by c.txid, c.id
+     limit p_limit
+  ),
+  last_entry as (
+    select w.txid, w.id from log_window w order by w.txid desc, w.id desc limit 1
+  ),
+  latest as (
+    select distinct on (w.entity, w.row_id) w.entity, w.row_id, w.op
+      from log_window w
+     order by w.entity, w.row_id, w.txid desc, w.id desc
+  ),
+  resolved as (
+    select l.entity, l.row_id,
+           case when l.op = 'delete' then null
+                when l.entity = 'transactions' then (select to_jsonb(t) from transactions t where t.id = l.row_id and t.family_id = p_family_id)
+                when l.entity = 'accounts' then (select to_jsonb(a) from accounts a where a.id = l.row_id and a.family_id = p_family_id)
+                when l.entity = 'budgets' then (select to_jsonb(b) from budgets b where b.id = l.row_id and b.family_id = p_family_id)
+                when l.entity = 'debts' then (select to_jsonb(d) from debts d where d.id = l.row_id and d.family_id = p_family_id)
+           end as data
+      from latest l
+  )
+  select json_build_object(
+    -- A full page resumes after its last entry; otherwise everything below
+    -- xmin has been read and the next call starts at xmin
+    'cursor', case when (select count(*) from log_window) >= p_limit
+                   then (select json_build_object('txid', e.txid, 'id', e.id) from last_entry e)
+                   when p_after_txid >= (select h.xmin from horizon h)
+                   then json_build_object('txid', p_after_txid, 'id', coalesce(p_after_id, 0))
+                   else (select json_build_object('txid', h.xmin, 'id', 0) from horizon h) end,
+    'has_more', (select count(*) from log_window) >= p_limit,
+    'changes', coalesce((select json_agg(json_build_object('entity', r.entity, 'id', r.row_id, 'data', r.data)) from resolved r), '[]'::json)
+  );
+$$ language sql stable;
+
+-- Drops log entries (and tombstones) older than p_keep; clients whose
+-- cursor is older must resync from the list endpoints.
+create or replace function public.prune_family_changes(p_keep interval default interval '90 days')
+returns bigint as $$
+  with deleted as (
+    delete from family_changes where changed_at < timezone('utc'::text, now()) - p_keep returning 1
+  )
+  select count(*) from deleted;
+$$ language sql;
+
+-- Per-family data versions for conditional GETs. Every write to a family's
+-- rows bumps the counter of that entity, so an unchanged version means the
+-- cached list is still current. Member lists follow profiles.family_id.
+create table if not exists family_versions (
+  family_id uuid not null,
+  entity text not null,
+  version bigint not null default 1,
+  primary key (family_id, entity)
+);
+
+alter table family_versions enable row level security;
+
+create or replace function public.bump_family_version(p_family_id uuid, p_entity text)
+returns void as $$
+  insert into family_versions (family_id, entity) values (p_family_id, p_entity)
+  on conflict (family_id, entity) do update set version = family_versions.version + 1;
+$$ language sql;
+
+create or replace function public.bump_family_version_trigger()
+returns trigger as $$
+declare
+  v_entity text := coalesce(tg_argv[0], tg_table_name);
+begin
+  if tg_op in ('UPDATE', 'DELETE') and old.family_id is not null then
+    perform public.bump_family_version(old.family_id, v_entity);
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') and new.family_id is not null
+     and (tg_op = 'INSERT' or new.family_id is distinct from old.family_id) then
+    perform public.bump_family_version(new.family_id, v_entity);
+  end if;
+  return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists transactions_version on transactions;
+create trigger transactions_version after insert or update or delete on transactions
+  for each row execute function public.bump_family_version_trigger();
+drop trigger if exists accounts_version on accounts;
+create trigger accounts_version after insert or update or delete on accounts
+  for each row execute function public.bump_family_version_trigger();
+-- Balance updates bump "accounts" on every transaction; "account_meta" only
+-- moves when the cached account list itself (id, name, type, owner) changes
+drop trigger if exists accounts_meta_version on accounts;
+create trigger accounts_meta_version after insert or delete or update of name, type, user_id, family_id on accounts
+  for each row execute function public.bump_family_version_trigger('account_meta');
+drop trigger if exists budgets_version on budgets;
+create trigger budgets_version after insert or update or delete on budgets
+  for each row execute function public.bump_family_version_trigger();
+drop trigger if exists debts_version on debts;
+create trigger debts_version after insert or update or delete on debts
+  for each row execute function public.bump_family_version_trigger();
+drop trigger if exists categories_version on categories;
+create trigger categories_version after insert or update or delete on categories
+  for each row execute function public.bump_family_version_trigger();
+drop trigger if exists profiles_version on profiles;
+create trigger profiles_version after insert or update or delete on profiles
+  for each row execute function public.bump_family_version_trigger('members');
+
+-- Transactions with the display names the API returns, so list and export
+-- reads need no follow-up lookups. security_invoker keeps the caller's RLS.
+create or replace view public.transactions_enriched with (security_invoker = true) as
+select t.id, t.description, t.amount, t.type, t.date, t.category_id, t.account_id,
+       t.target_account_id, t.receipt_url, t.user_id, t.family_id, t.created_at,
+       c.name as category_name,
+       a.name as account_name,
+       p.full_name as user_name
+  from transactions t
+  left join categories c on c.id = t.category_id
+  left join accounts a on a.id = t.account_id
+  left join profiles p on p.id = t.user_id;
+
+-- Keyset-ordered reads of a family's history and of one account's history
+create index if not exists transactions_family_date_idx on transactions (family_id, date desc, id desc);
+create index if not exists transactions_account_date_idx on transactions (account_id, date desc, id desc);
+
+-- Transactions visible to p_user_id (KNOWLEDGE.md, "Alcance y Visibilidad"):
+--   family scope:   joint accounts, the caller's personal accounts and every family transfer
+--   personal scope: the caller's personal accounts only
+-- newest first, strictly after the (p_cursor_date, p_cursor_id) keyset
+-- cursor when given. A plain SQL function, so the planner inlines it and
+-- the filters, order and limit run against the indexes above.
+create or replace function public.get_visible_transactions(
+  p_family_id uuid,
+  p_user_id uuid,
+  p_scope text default 'family',
+  p_start_date timestamp with time zone default null,
+  p_end_date timestamp with time zone default null,
+  p_cursor_date timestamp with time zone default null,
+  p_cursor_id uuid default null,
+  p_limit integer default null
+)
+returns setof transactions_enriched as $$
+  select v.*
+    from transactions_enriched v
+   where v.family_id = p_family_id
+     and (v.account_id in (
+            select a.id from accounts a
+             where a.family_id = p_family_id
+               and (a.user_id = p_user_id or (p_scope <> 'personal' and a.user_id is null)))
+          or (p_scope <> 'personal' and v.type = 'transfer'))
+     -- Missing bounds and cursor become sentinels rather than "is null or ...":
+     -- the arguments arrive as parameters, and only a plain comparison can
+     -- be used as an index condition for every page
+     and v.date >= coalesce(p_start_date, '-infinity')
+     and v.date <= coalesce(p_end_date, 'infinity')
+     and (v.date, v.id) < (coalesce(p_cursor_date, 'infinity'), coalesce(p_cursor_id, 'ffffffff-ffff-ffff-ffff-ffffffffffff'))
+   order by v.date desc, v.id desc
+   limit p_limit;
+$$ language sql stable;
+
+-- Bank statement ids (OFX FITID) of imported transactions, unique per
+-- account, so importing the same statement twice skips the stored rows
+alter table transactions add column if not exists external_id text;
+create unique index if not exists transactions_account_external_id_idx
+  on transactions (account_id, external_id) where external_id is not null;
+
+-- One import batch: the rows and their balance changes are written in the same
+-- database transaction. Rows whose external_id is already stored for the
+-- account are skipped and reported back.
+-- Returns {inserted, deltas: {account_id: delta}, duplicates: [{account_id, external_id}]}.
+create or replace function public.import_transaction_batch(p_family_id uuid, p_user_id uuid, p_rows jsonb)
+returns jsonb as $$
+declare
+  v_inserted integer;
+  v_deltas jsonb;
+  v_duplicates jsonb;
+begin
+  if p_family_id is null then
+    raise exception 'User does not belong to a family';
+  end if;
+  if exists (
+    select 1 from jsonb_populate_recordset(null::transactions, p_rows) r
+     where not exists (select 1 from accounts a where a.id = r.account_id and a.family_id = p_family_id)
+        or (r.target_account_id is not null
+            and not exists (select 1 from accounts a where a.id = r.target_account_id and a.family_id = p_family_id))
+  ) then
+    raise exception 'Not authorized';
+  end if;
+
+  with incoming as (
+    select * from jsonb_populate_recordset(null::transactions, p_rows)
+  ),
+  inserted as (
+    insert into transactions (description, amount, type, date, category_id, account_id, target_account_id, receipt_url, external_id, user_id, family_id)
+    select description, amount, type, coalesce(date, now()), category_id, account_id, target_account_id, receipt_url, external_id, p_user_id, p_family_id
+      from incoming
+    on conflict (account_id, external_id) where external_id is not null do nothing
+    returning *
+  ),
+  deltas as (
+    select d.key, sum(d.value::numeric) as total
+      from inserted i, jsonb_each_text(public.transaction_deltas(row(i.*)::transactions)) d
+     group by d.key
+  )
+  select (select count(*) from inserted),
+         (select coalesce(jsonb_object_agg(key, total), '{}'::jsonb) from deltas where total <> 0),
+         (select coalesce(jsonb_agg(jsonb_build_object('account_id', n.account_id, 'external_id', n.external_id)), '[]'::jsonb)
+            from incoming n
+           where n.external_id is not null
+             and not exists (select 1 from inserted i where i.account_id = n.account_id and i.external_id = n.external_id))
+    into v_inserted, v_deltas, v_duplicates;
+
+  perform public.apply_account_deltas(v_deltas);
+  return jsonb_build_object('inserted', v_inserted, 'deltas', v_deltas, 'duplicates', v_duplicates);
+end;
+$$ language plpgsql;